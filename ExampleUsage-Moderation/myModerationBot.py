@@ -2,6 +2,8 @@ import discord
 from discord.ext import commands, tasks
 # Misc
 import os
+import sys
+import logging
 from dotenv import load_dotenv
 # DB and Networking
 import requests
@@ -11,50 +13,77 @@ import sqlite3
 from datetime import datetime, timedelta
 from dateutil import parser
 import time
-# Middle DB access layer
-import dbAccessLayer
-from dbAccessLayer import createModeration
+# Shared launchpad package at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Middle DB access layer (runs on its own thread)
+from launchpad.asyncDbAccess import db
+from launchpad.connection import configurePool
+from launchpad.createTables import createDatabaseTables
+from launchpad.activityCounters import ActivityCounter
+from launchpad.caches import KnownUserCache, ServerConfigCache, GuildResolver, DEFAULT_PREFIX
+from launchpad.metrics import MetricsExporter, timeEvent, instrumentCommands
+from launchpad.loopMonitor import LoopMonitor
 
 #----------------------------------------------------------------
 
 
-# Connect to the SQLite database
-
 load_dotenv()
 
 token = os.getenv('DiscordToken')
-loggingChannelID = os.getenv('LoggingChannelID')
-muteRoleID = os.getenv('MuteRoleID')
+# Discord IDs from the environment; the Server table's LogChannel/MuteRole take precedence
+loggingChannelID = int(os.getenv('LoggingChannelID') or 0) or None
+muteRoleID = int(os.getenv('MuteRoleID') or 0) or None
 
-conn = sqlite3.connect('./myModerationDatabase.db')
-c = conn.cursor()
+# This bot's database file, then bring the schema up to date; a single version check when it already is
+configurePool(database=os.getenv('LaunchpadDatabase', 'myModerationDatabase.db'))
+createDatabaseTables()
+
+# UserIDs already known to be in the User table, so repeat authors skip the DB entirely
+knownUsers = KnownUserCache()
+db.users.addWriteListener(knownUsers.discard)
+
+# Per-guild Server rows (prefix, roles, log channel), invalidated on every db.servers write
+serverConfigs = ServerConfigCache(db)
+
+# Per-guild mute/mod/admin roles and log channel, resolved once from the Server row
+guildObjects = GuildResolver(serverConfigs, db, loggingChannelID, muteRoleID)
+
+async def handleNewUser(UserID, Username, Avatar, IsBot, JoinedAt):
+    if UserID in knownUsers:
+        return
+    if await db.users.ensure(UserID, Username, Avatar, IsBot, JoinedAt):
+        knownUsers.add(UserID)
+
+# Message/reaction counters are buffered and flushed in batches
+activity = ActivityCounter(db)
+
+# Set the bot's command prefix, per server from the Server.Prefix column
+async def getPrefix(bot, message):
+    if message.guild is None:
+        return DEFAULT_PREFIX
+    return await serverConfigs.prefix(message.guild.id)
 
-def handleNewUser(UserID, Username, Avatar, IsBot):
-    startTime = time.time()
-    c.execute("SELECT * FROM User WHERE UserID = ?", (UserID,))
-    user = c.fetchone()
-    
-    if not user:
-        c.execute("INSERT INTO User (UserID, Username, Avatar, IsBot) VALUES (?, ?, ?, ?)",
-                    (UserID, Username, Avatar, IsBot))
-        conn.commit()
-        
-    endTime = time.time()
-    writeTime = endTime - startTime
-    print(f"Total WRITE time for user {UserID}: {writeTime} seconds")
-
-# Set the bot's command prefix
 intents = discord.Intents.all()
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = commands.Bot(command_prefix=getPrefix, intents=intents)
+
+# Count and time every command (launchpad_handler_* metrics)
+instrumentCommands(bot)
+
+# Watches the event loop for lag and for callbacks that block it (!perf, launchpad_loop_* metrics)
+loopMonitor = LoopMonitor(bot)
 
 #--------------------------------[Events]--------------------------------
 
 # Event handler for when the bot is ready
 @bot.event
+@timeEvent
 async def on_ready():
+    activity.start()
+    loopMonitor.start()
     print(f'{bot.user.name} is up and running!')
 
 @bot.event
+@timeEvent
 async def on_message(message):
     # Return if the message author is self
     if message.author.bot:
@@ -62,21 +91,19 @@ async def on_message(message):
     
     userID = message.author.id
     username = message.author.name
-    avatar = str(message.author.avatar.url)
+    avatar = str(message.author.display_avatar.url)
     isBot = message.author.bot
+    joinedAt = getattr(message.author, 'joined_at', None) or datetime.utcnow()
     
-    handleNewUser(userID, username, avatar, isBot)
+    await handleNewUser(userID, username, avatar, isBot, joinedAt)
     
     # Increment total messages count for the user
-    try:
-        c.execute("UPDATE User SET TotalMessages = TotalMessages + 1 WHERE UserID = ?", (userID,))
-        conn.commit()
-    except sqlite3.Error as e:
-        print(f"Error updating total messages count: {e}")
+    activity.addMessage(userID, message.guild.id if message.guild else None)
 
     await bot.process_commands(message)
     
 @bot.event
+@timeEvent
 async def on_reaction_add(reaction, user):
     # Return if the reaction is added by a bot
     if user.bot:
@@ -85,12 +112,40 @@ async def on_reaction_add(reaction, user):
     userID = user.id
 
     # Increment total reactions count for the user
-    try:
-        c.execute("UPDATE User SET TotalReactions = TotalReactions + 1 WHERE UserID = ?", (userID,))
-        conn.commit()
-    except sqlite3.Error as e:
-        print(f"Error updating total reactions count: {e}")
+    guild = reaction.message.guild
+    activity.addReaction(userID, guild.id if guild else None)
     
+# Resolved roles/channels go stale when the guild's roles or channels change
+@bot.event
+@timeEvent
+async def on_guild_role_create(role):
+    guildObjects.invalidate(role.guild.id)
+
+@bot.event
+@timeEvent
+async def on_guild_role_update(before, after):
+    guildObjects.invalidate(after.guild.id)
+
+@bot.event
+@timeEvent
+async def on_guild_role_delete(role):
+    guildObjects.invalidate(role.guild.id)
+
+@bot.event
+@timeEvent
+async def on_guild_channel_create(channel):
+    guildObjects.invalidate(channel.guild.id)
+
+@bot.event
+@timeEvent
+async def on_guild_channel_update(before, after):
+    guildObjects.invalidate(after.guild.id)
+
+@bot.event
+@timeEvent
+async def on_guild_channel_delete(channel):
+    guildObjects.invalidate(channel.guild.id)
+
 #--------------------------------[Commands]------------------------------
 
 @bot.command()
@@ -109,7 +164,6 @@ async def moderate(ctx, action: str, member: discord.Member, *, reason=None):
         return
 
     serverID = ctx.guild.id
-    userID = member.id
     moderatorID = ctx.author.id
     actionUpper = action.upper()
     createdAt = datetime.utcnow()
@@ -124,36 +178,138 @@ async def moderate(ctx, action: str, member: discord.Member, *, reason=None):
     )
     embed.add_field(name="Reason", value=reason)
 
-    createModeration(serverID, str(userID), actionUpper, reason, moderatorID, createdAt)
+    # The DB write, log post, DM and the action itself don't depend on each other, so they run
+    # concurrently; one failing (e.g. the member has DMs closed) doesn't stop the others
+    steps = {
+        "Recording the action": recordModeration(serverID, member, actionUpper, reason, moderatorID, createdAt),
+        "Posting to the log channel": postModerationLog(ctx.guild, member, ctx.author, action, actionUpper, reason),
+    }
+    if action in ("kick", "ban"):
+        steps[action.capitalize()] = notifyThenRemove(member, action, reason, embed)
+    else:
+        steps["Sending the DM"] = member.send(embed=embed)
+        steps[action.capitalize()] = applyModeration(ctx.guild, member, action)
+
+    results = dict(zip(steps, await asyncio.gather(*steps.values(), return_exceptions=True)))
+    failures = [f"{label} failed: {result}" for label, result in results.items() if isinstance(result, Exception)]
+    # notifyThenRemove reports a failed DM as text rather than raising, so the kick/ban still went ahead
+    if action in ("kick", "ban") and isinstance(results[action.capitalize()], str):
+        failures.append(f"Could not DM the member: {results[action.capitalize()]}")
+    if failures:
+        await ctx.send("\n".join(failures))
+
+async def recordModeration(serverID, member, actionUpper, reason, moderatorID, createdAt):
+    # Record the action atomically with a single commit; createModeration also bumps the
+    # member's guild summary and Warns/Kicks/Mutes counter
+    async with db.transaction():
+        await db.users.ensure(member.id, member.name, str(member.display_avatar.url), member.bot, member.joined_at or createdAt)
+        await db.moderations.create(serverID, member.id, actionUpper, reason, moderatorID, createdAt)
+    knownUsers.add(member.id)
 
-    logChannel = bot.get_channel(loggingChannelID)
+async def postModerationLog(guild, member, moderator, action, actionUpper, reason):
+    logChannel = await guildObjects.logChannel(guild)
     if logChannel:
         logEmbed = discord.Embed(
             title=f"User {actionUpper}ed",
-            description=f"{member.mention} has been {action}ed by {ctx.author.mention}",
+            description=f"{member.mention} has been {action}ed by {moderator.mention}",
             color=discord.Color.red()
         )
         logEmbed.add_field(name="Reason", value=reason)
         await logChannel.send(embed=logEmbed)
 
-    await member.send(embed=embed)
-
-    if action == "mute":
-        muteRole = discord.utils.get(ctx.guild.roles, name="Muted")
-        if muteRole:
-            await member.add_roles(muteRole)
-        else:
-            await ctx.send("Could not find the 'Muted' role.")
-    elif action == "kick":
+async def notifyThenRemove(member, action, reason, embed):
+    # Members can't be DMed once they've left the guild, so this DM has to land first.
+    # Returns why the DM failed (None if it was sent); a failed removal raises as usual
+    dmError = None
+    try:
+        await member.send(embed=embed)
+    except discord.HTTPException as e:
+        logging.error(f"Could not DM {member} before {action}: {str(e)}")
+        dmError = str(e)
+    if action == "kick":
         await member.kick(reason=reason)
-    elif action == "ban":
+    else:
         await member.ban(reason=reason)
-    elif action == "unmute":
-        mute_role = discord.utils.get(ctx.guild.roles, name="Muted")
-        if mute_role:
-            await member.remove_roles(muteRole)
-        else:
-            await ctx.send("Could not find the 'Muted' role.")
-        
-# Run the bot with your bot token
-bot.run(token)
\ No newline at end of file
+    return dmError
+
+async def applyModeration(guild, member, action):
+    if action not in ("mute", "unmute"):
+        return
+    muteRole = await guildObjects.muteRole(guild)
+    if muteRole is None:
+        raise commands.CommandError("no mute role is configured and there is no 'Muted' role.")
+    if action == "mute":
+        await member.add_roles(muteRole)
+    else:
+        await member.remove_roles(muteRole)
+
+HISTORY_PAGE_SIZE = 10
+
+def historyEmbed(member, summary, rows):
+    embed = discord.Embed(title=f"Moderation history for {member}", color=discord.Color.orange())
+    if summary:
+        serverID, userID, warns, kicks, mutes, bans, total, lastActionAt = summary
+        embed.description = f"{total} actions: {warns} warns, {mutes} mutes, {kicks} kicks, {bans} bans"
+    else:
+        embed.description = "No moderation actions recorded."
+    for moderationID, serverID, userID, action, reason, moderatorID, createdAt in rows:
+        embed.add_field(name=f"#{moderationID} {action} - {str(createdAt)[:16]}",
+                        value=f"by <@{moderatorID}>: {reason or 'No reason provided.'}", inline=False)
+    return embed
+
+class HistoryView(discord.ui.View):
+    """Older button that pages back from the last row shown, keyset style"""
+
+    def __init__(self, authorID, member, summary, rows):
+        super().__init__(timeout=120)
+        self.authorID = authorID
+        self.member = member
+        self.summary = summary
+        self.setPage(rows)
+
+    def setPage(self, rows):
+        # One extra row is fetched to know whether an older page exists
+        self.rows = rows[:HISTORY_PAGE_SIZE]
+        self.older.disabled = len(rows) <= HISTORY_PAGE_SIZE
+        last = self.rows[-1] if self.rows else None
+        self.before = (last[6], last[0]) if last else None
+
+    @discord.ui.button(label="Older", style=discord.ButtonStyle.secondary)
+    async def older(self, interaction, button):
+        if interaction.user.id != self.authorID:
+            await interaction.response.send_message("Only the moderator who ran this can page it.", ephemeral=True)
+            return
+        rows = await db.moderations.history(self.member.guild.id, self.member.id, self.before, HISTORY_PAGE_SIZE + 1)
+        self.setPage(rows)
+        await interaction.response.edit_message(embed=historyEmbed(self.member, self.summary, self.rows), view=self)
+
+@bot.command()
+@commands.guild_only()
+@commands.has_permissions(kick_members=True)
+async def history(ctx, member: discord.Member):
+    """Show a member's moderation history on this server"""
+    summary, rows = await asyncio.gather(
+        db.moderations.summary(ctx.guild.id, member.id),
+        db.moderations.history(ctx.guild.id, member.id, None, HISTORY_PAGE_SIZE + 1),
+    )
+    view = HistoryView(ctx.author.id, member, summary, rows)
+    await ctx.send(embed=historyEmbed(member, summary, view.rows), view=view)
+
+@bot.command()
+@commands.is_owner()
+async def perf(ctx):
+    """Show event loop lag and the handlers that stalled it"""
+    await ctx.send(loopMonitor.report())
+
+# Importing the module (e.g. from loadGenerator.py) sets the bot up without connecting to Discord
+if __name__ == '__main__':
+    # Prometheus metrics go to LaunchpadMetricsFile and/or http://127.0.0.1:LaunchpadMetricsPort/metrics when set
+    exporter = MetricsExporter.fromEnvironment()
+    exporter.start()
+    db.addShutdownHook(exporter.stop)
+
+    # Run the bot with your bot token
+    bot.run(token)
+
+    # Let queued writes and buffered counters land before the process exits
+    db.shutdown()
\ No newline at end of file
@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands, tasks
 # Misc
 import os
+import sys
 from dotenv import load_dotenv
 # DB and Networking
 import requests
@@ -11,44 +12,101 @@ import sqlite3
 from datetime import datetime, timedelta
 from dateutil import parser
 import time
+import re
+# Shared launchpad package at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Middle DB access layer (runs on its own thread)
+from launchpad.asyncDbAccess import db
+from launchpad.connection import configurePool
+from launchpad.createTables import createDatabaseTables
+from launchpad.activityCounters import ActivityCounter
+from launchpad.leaderboard import Leaderboard
+from launchpad.caches import KnownUserCache, ServerConfigCache, GuildResolver, DEFAULT_PREFIX
+from launchpad.reminderScheduler import ReminderScheduler
+from launchpad.starboard import Starboard
+from launchpad.suggestions import SuggestionVotes, UPVOTE, DOWNVOTE
+from launchpad.metrics import MetricsExporter, timeEvent, instrumentCommands
+from launchpad.loopMonitor import LoopMonitor
 
 #----------------------------------------------------------------
 
 load_dotenv()
 token = os.getenv('DiscordToken')
-loggingChannelID = os.getenv('LoggingChannelID')
-muteRoleID = os.getenv('MuteRoleID')
+# Discord IDs from the environment; the Server table's LogChannel/MuteRole take precedence
+loggingChannelID = int(os.getenv('LoggingChannelID') or 0) or None
+muteRoleID = int(os.getenv('MuteRoleID') or 0) or None
 
-# Connect to the SQLite database
-conn = sqlite3.connect('./launchpad.db')
-c = conn.cursor()
+# This bot's database file, then bring the schema up to date; a single version check when it already is
+configurePool(database=os.getenv('LaunchpadDatabase', 'launchpad.db'))
+createDatabaseTables()
 
-def handleNewUser(UserID, Username, Avatar, IsBot):
-    startTime = time.time()
-    c.execute("SELECT * FROM User WHERE UserID = ?", (UserID,))
-    user = c.fetchone()
-    
-    if not user:
-        c.execute("INSERT INTO User (UserID, Username, Avatar, IsBot) VALUES (?, ?, ?, ?)",
-                    (UserID, Username, Avatar, IsBot))
-        conn.commit()
-        
-    endTime = time.time()
-    writeTime = endTime - startTime
-    print(f"Total WRITE time for user {UserID}: {writeTime} seconds")
+# UserIDs already known to be in the User table, so repeat authors skip the DB entirely
+knownUsers = KnownUserCache()
+db.users.addWriteListener(knownUsers.discard)
+
+# Per-guild Server rows (prefix, roles, log channel), invalidated on every db.servers write
+serverConfigs = ServerConfigCache(db)
+
+# Per-guild mute/mod/admin roles and log channel, resolved once from the Server row
+guildObjects = GuildResolver(serverConfigs, db, loggingChannelID, muteRoleID)
+
+async def handleNewUser(UserID, Username, Avatar, IsBot, JoinedAt):
+    if UserID in knownUsers:
+        return
+    if await db.users.ensure(UserID, Username, Avatar, IsBot, JoinedAt):
+        knownUsers.add(UserID)
+
+# Message/reaction counters are buffered and flushed in batches
+activity = ActivityCounter(db)
+
+# Per-guild top members, kept current from the counter flushes
+leaderboard = Leaderboard(db, activity)
+
+# Set the bot's command prefix, per server from the Server.Prefix column
+async def getPrefix(bot, message):
+    if message.guild is None:
+        return DEFAULT_PREFIX
+    return await serverConfigs.prefix(message.guild.id)
 
-# Set the bot's command prefix
 intents = discord.Intents.all()
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = commands.Bot(command_prefix=getPrefix, intents=intents)
+
+# Count and time every command (launchpad_handler_* metrics)
+instrumentCommands(bot)
+
+# Watches the event loop for lag and for callbacks that block it (!perf, launchpad_loop_* metrics)
+loopMonitor = LoopMonitor(bot)
+
+async def deliverReminder(reminder):
+    reminderID, serverID, userID, reminderText, remindAt, reminded = reminder
+    user = bot.get_user(userID) or await bot.fetch_user(userID)
+    await user.send(f"Reminder: {reminderText}")
+
+# Unsent reminders are delivered from an in-memory heap, paged in from the Reminders table
+reminders = ReminderScheduler(db, deliverReminder)
+
+# Star reactions are tallied in memory and reposted to the guild's starboard channels
+starboard = Starboard(bot, db)
+
+# Suggestion votes are tallied from reactions in memory and written back periodically
+suggestions = SuggestionVotes(bot, db)
 
 #--------------------------------[Events]--------------------------------
 
 # Event handler for when the bot is ready
 @bot.event
+@timeEvent
 async def on_ready():
+    activity.start()
+    reminders.start()
+    starboard.start()
+    suggestions.start()
+    loopMonitor.start()
+    asyncio.ensure_future(leaderboard.warm([guild.id for guild in bot.guilds]))
     print(f'{bot.user.name} is up and running!')
 
 @bot.event
+@timeEvent
 async def on_message(message):
     # Return if the message author is self
     if message.author.bot:
@@ -56,21 +114,35 @@ async def on_message(message):
     
     userID = message.author.id
     username = message.author.name
-    avatar = str(message.author.avatar.url)
+    avatar = str(message.author.display_avatar.url)
     isBot = message.author.bot
+    joinedAt = getattr(message.author, 'joined_at', None) or datetime.utcnow()
     
-    handleNewUser(userID, username, avatar, isBot)
+    await handleNewUser(userID, username, avatar, isBot, joinedAt)
     
     # Increment total messages count for the user
-    try:
-        c.execute("UPDATE User SET TotalMessages = TotalMessages + 1 WHERE UserID = ?", (userID,))
-        conn.commit()
-    except sqlite3.Error as e:
-        print(f"Error updating total messages count: {e}")
+    activity.addMessage(userID, message.guild.id if message.guild else None)
 
     await bot.process_commands(message)
     
 @bot.event
+@timeEvent
+async def on_guild_join(guild):
+    # Backfill the guild's members with one batched upsert instead of a round-trip per member
+    rows = [(member.id, member.name, str(member.display_avatar.url), member.bot, member.joined_at or datetime.utcnow())
+            for member in guild.members if not member.bot and member.id not in knownUsers]
+    if rows and await db.users.ensureMany(rows) is not None:
+        for row in rows:
+            knownUsers.add(row[0])
+    await db.members.ensureMany([(guild.id, member.id, member.joined_at) for member in guild.members if not member.bot])
+
+@bot.event
+@timeEvent
+async def on_guild_remove(guild):
+    leaderboard.forget(guild.id)
+
+@bot.event
+@timeEvent
 async def on_reaction_add(reaction, user):
     # Return if the reaction is added by a bot
     if user.bot:
@@ -79,14 +151,199 @@ async def on_reaction_add(reaction, user):
     userID = user.id
 
     # Increment total reactions count for the user
-    try:
-        c.execute("UPDATE User SET TotalReactions = TotalReactions + 1 WHERE UserID = ?", (userID,))
-        conn.commit()
-    except sqlite3.Error as e:
-        print(f"Error updating total reactions count: {e}")
+    guild = reaction.message.guild
+    activity.addReaction(userID, guild.id if guild else None)
+    starboard.track(reaction)
+    await suggestions.track(reaction)
+
+@bot.event
+@timeEvent
+async def on_reaction_remove(reaction, user):
+    if user.bot:
+        return
+    starboard.track(reaction)
+    await suggestions.track(reaction)
         
         
+# Resolved roles/channels go stale when the guild's roles or channels change
+@bot.event
+@timeEvent
+async def on_guild_role_create(role):
+    guildObjects.invalidate(role.guild.id)
+
+@bot.event
+@timeEvent
+async def on_guild_role_update(before, after):
+    guildObjects.invalidate(after.guild.id)
+
+@bot.event
+@timeEvent
+async def on_guild_role_delete(role):
+    guildObjects.invalidate(role.guild.id)
+
+@bot.event
+@timeEvent
+async def on_guild_channel_create(channel):
+    guildObjects.invalidate(channel.guild.id)
+
+@bot.event
+@timeEvent
+async def on_guild_channel_update(before, after):
+    guildObjects.invalidate(after.guild.id)
+
+@bot.event
+@timeEvent
+async def on_guild_channel_delete(channel):
+    guildObjects.invalidate(channel.guild.id)
+
 #--------------------------------[Commands]--------------------------------
 
-# Run the bot with your bot token
-bot.run(token)
\ No newline at end of file
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+def parseRemindAt(when):
+    # "90s", "10m", "1h30m", "2d" from now, or an absolute date/time
+    parts = re.findall(r'(\d+)([smhdw])', when.lower())
+    if parts and ''.join(amount + unit for amount, unit in parts) == when.lower():
+        return int(time.time()) + sum(int(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+    return int(parser.parse(when).timestamp())
+
+@bot.command()
+async def remind(ctx, when: str, *, text: str):
+    """Remind you by DM, e.g. !remind 1h30m stretch"""
+    try:
+        remindAt = parseRemindAt(when)
+    except (ValueError, OverflowError):
+        await ctx.send("I couldn't read that time. Try something like `10m`, `2h` or `2025-01-01 09:00`.")
+        return
+
+    serverID = ctx.guild.id if ctx.guild else 0
+    reminderID = await db.reminders.create(serverID, ctx.author.id, text, remindAt)
+    if reminderID is None:
+        await ctx.send("Sorry, I couldn't save that reminder.")
+        return
+    reminders.schedule((reminderID, serverID, ctx.author.id, text, remindAt, False))
+    await ctx.send(f"Okay, I'll remind you <t:{remindAt}:R>.")
+
+@bot.command(name='starboard')
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def setStarboard(ctx, channel: discord.TextChannel, minStars: int = 3):
+    """Repost messages with at least minStars stars to channel"""
+    for row in await db.starboards.forServer(ctx.guild.id):
+        if row[2] == channel.id:
+            await db.starboards.update(row[0], MinStars=minStars)
+            break
+    else:
+        await db.starboards.create(ctx.guild.id, channel.id, minStars)
+    await ctx.send(f"Messages with {minStars} or more stars will be reposted to {channel.mention}.")
+
+@bot.command()
+@commands.guild_only()
+async def suggest(ctx, *, text: str):
+    """Post a suggestion for the server to vote on"""
+    embed = discord.Embed(title="Suggestion", description=text, colour=discord.Colour.blurple())
+    embed.set_author(name=ctx.author.display_name, icon_url=ctx.author.display_avatar.url)
+    post = await ctx.send(embed=embed)
+    suggestionID = await db.suggestions.create(ctx.guild.id, ctx.author.id, text, post.id, datetime.utcnow())
+    if suggestionID is None:
+        await post.delete()
+        await ctx.send("Sorry, I couldn't save that suggestion.")
+        return
+    suggestions.register(post.id, suggestionID)
+    embed.set_footer(text=f"Suggestion #{suggestionID}")
+    await post.edit(embed=embed)
+    await post.add_reaction(UPVOTE)
+    await post.add_reaction(DOWNVOTE)
+
+async def resolveSuggestion(ctx, suggestionID, status):
+    row = await db.suggestions.get(suggestionID)
+    if row is None or row[1] != ctx.guild.id:
+        await ctx.send(f"There is no suggestion #{suggestionID} on this server.")
+        return
+    if row[6] != 'pending':
+        await ctx.send(f"Suggestion #{suggestionID} was already {row[6]}.")
+        return
+    try:
+        upvotes, downvotes = await suggestions.resolve(row, status, ctx.author.id)
+    except sqlite3.Error:
+        await ctx.send(f"Sorry, I couldn't save that decision; suggestion #{suggestionID} is still pending.")
+        return
+    await ctx.send(f"Suggestion #{suggestionID} {status} ({upvotes} {UPVOTE} / {downvotes} {DOWNVOTE}).")
+
+@bot.command()
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def approve(ctx, suggestionID: int):
+    """Approve a pending suggestion"""
+    await resolveSuggestion(ctx, suggestionID, 'approved')
+
+@bot.command()
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def deny(ctx, suggestionID: int):
+    """Deny a pending suggestion"""
+    await resolveSuggestion(ctx, suggestionID, 'denied')
+
+@bot.command(name='suggestions')
+@commands.guild_only()
+async def listSuggestions(ctx):
+    """List the oldest pending suggestions on this server"""
+    rows = await db.suggestions.pending(ctx.guild.id, 10)
+    if not rows:
+        await ctx.send("There are no pending suggestions.")
+        return
+    lines = []
+    for row in rows:
+        upvotes, downvotes = suggestions.votes(row)
+        lines.append(f"#{row[0]} ({upvotes} {UPVOTE} / {downvotes} {DOWNVOTE}) {row[3][:80]}")
+    await ctx.send("\n".join(lines))
+
+@bot.command(name='leaderboard')
+@commands.guild_only()
+async def showLeaderboard(ctx, ranking: str = 'messages'):
+    """Show the most active members, by messages or reactions"""
+    ranking = ranking.lower()
+    if ranking not in ('messages', 'reactions'):
+        await ctx.send("Rank by `messages` or `reactions`.")
+        return
+    rows = await leaderboard.top(ctx.guild.id, ranking)
+    if not rows:
+        await ctx.send("Nobody has been counted yet.")
+        return
+    lines = [f"{place}. <@{userID}> - {count} {ranking}" for place, (userID, count) in enumerate(rows, start=1)]
+    await ctx.send(embed=discord.Embed(title=f"Top members by {ranking}", description="\n".join(lines),
+                                       colour=discord.Colour.gold()))
+
+@bot.command()
+@commands.is_owner()
+async def cachestats(ctx):
+    """Show hit rates of the in-memory caches"""
+    stats = knownUsers.stats()
+    configStats = serverConfigs.stats()
+    resolverStats = guildObjects.stats()
+    await ctx.send(f"Known users: {stats['size']}/{stats['maxSize']} cached, "
+                   f"{stats['hitRate']:.1%} hit rate ({stats['hits']} hits, {stats['misses']} misses, "
+                   f"{stats['evictions']} evictions)\n"
+                   f"Server configs: {configStats['size']}/{configStats['maxSize']} cached, "
+                   f"{configStats['hitRate']:.1%} hit rate ({configStats['hits']} hits, {configStats['misses']} misses)\n"
+                   f"Guild roles/channels: {resolverStats['size']} guilds, "
+                   f"{resolverStats['hitRate']:.1%} hit rate ({resolverStats['hits']} hits, {resolverStats['misses']} misses)")
+
+@bot.command()
+@commands.is_owner()
+async def perf(ctx):
+    """Show event loop lag and the handlers that stalled it"""
+    await ctx.send(loopMonitor.report())
+
+# Importing the module (e.g. from loadGenerator.py) sets the bot up without connecting to Discord
+if __name__ == '__main__':
+    # Prometheus metrics go to LaunchpadMetricsFile and/or http://127.0.0.1:LaunchpadMetricsPort/metrics when set
+    exporter = MetricsExporter.fromEnvironment()
+    exporter.start()
+    db.addShutdownHook(exporter.stop)
+
+    # Run the bot with your bot token
+    bot.run(token)
+
+    # Let queued writes and buffered counters land before the process exits
+    db.shutdown()
\ No newline at end of file
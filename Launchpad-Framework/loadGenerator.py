@@ -0,0 +1,433 @@
+"""
+Offline Load Generator for the Launchpad Bots
+
+Drives a bot's real event handlers (on_message, on_reaction_add and, for the moderation bot, the !moderate
+command) with fake Discord objects instead of a gateway connection, so the handlers, caches, write-behind
+counters and the database underneath them can be measured end to end without a token or a live server.
+
+The event schedule is generated up front from `--seed`: guilds and users are picked with Zipf-skewed weights
+(a few very active members and guilds, a long tail of quiet ones), and the event type follows `--mix`. Events
+are then dispatched open-loop at `--rate` per second, one task per event the way discord.py dispatches them.
+Calls the handlers would make to Discord's REST API (DMs, log posts, kicks, role changes) are faked and can be
+given a simulated round-trip with `--api-latency`.
+
+It reports per-event-type handler latency (p50/p95/p99/max), the event loop's scheduling lag while the load
+runs, the database commit rate and the loop stalls the bot's LoopMonitor attributed to each handler, as `rich`
+tables and optionally as JSON (`--json`). `--metrics` also
+writes the bot's Prometheus metrics (per-table DB call timings, per-handler timings) as they stood at the end.
+
+Usage:
+    python loadGenerator.py --bot framework --events 20000 --rate 1000
+    python loadGenerator.py --bot moderation --mix message=0.7,reaction=0.25,moderate=0.05 --api-latency 0.05
+
+The bot writes to `--database` (default loadTest.db), never to its own database file.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from rich.console import Console
+from rich.table import Table
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from launchpad.connection import getPool
+from launchpad.dbAccessLayer import createMany
+from launchpad.metrics import MetricsExporter
+
+BOT_MODULES = {
+    'framework': ('LaunchpadFramework', os.path.join(REPO_ROOT, 'Launchpad-Framework', 'LaunchpadFramework.py')),
+    'moderation': ('myModerationBot', os.path.join(REPO_ROOT, 'ExampleUsage-Moderation', 'myModerationBot.py')),
+}
+DEFAULT_MIX = {
+    'framework': {'message': 0.75, 'reaction': 0.25},
+    'moderation': {'message': 0.70, 'reaction': 0.28, 'moderate': 0.02},
+}
+REACTION_EMOJI = ['\N{WHITE MEDIUM STAR}', '\N{FACE WITH TEARS OF JOY}', '\N{HEAVY BLACK HEART}', '\N{EYES}']
+MODERATION_ACTIONS = ['warn', 'warn', 'warn', 'mute', 'unmute', 'kick', 'ban']
+BASE_ID = 100000000000000000
+BOT_USER_ID = BASE_ID - 1
+LAG_INTERVAL = 0.005
+PERCENTILES = (0.50, 0.95, 0.99)
+
+# Fake Discord objects: only the attributes and coroutines the handlers actually touch
+
+class FakeAPI:
+    # Simulated REST round-trip for every call the handlers make to Discord
+    latency = 0.0
+    calls = 0
+
+    @classmethod
+    async def call(cls):
+        cls.calls += 1
+        if cls.latency:
+            await asyncio.sleep(cls.latency)
+
+class FakeAsset:
+    def __init__(self, url):
+        self.url = url
+
+class FakeRole:
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+class FakeChannel:
+    def __init__(self, id, guild):
+        self.id = id
+        self.guild = guild
+        self.mention = f"<#{id}>"
+
+    async def send(self, content=None, **kwargs):
+        await FakeAPI.call()
+
+class FakeUser:
+    def __init__(self, id, name, bot=False, joined_at=None):
+        self.id = id
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+        self.joined_at = joined_at
+        self.mention = f"<@{id}>"
+        self.avatar = FakeAsset(f"https://cdn.discordapp.com/avatars/{id}/fake.png")
+        self.display_avatar = self.avatar
+
+    def __str__(self):
+        return self.name
+
+    async def send(self, content=None, **kwargs):
+        await FakeAPI.call()
+
+    async def kick(self, reason=None):
+        await FakeAPI.call()
+
+    async def ban(self, reason=None):
+        await FakeAPI.call()
+
+    async def add_roles(self, *roles):
+        await FakeAPI.call()
+
+    async def remove_roles(self, *roles):
+        await FakeAPI.call()
+
+class FakeGuild:
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+        self.muteRole = FakeRole(id + 1, 'Muted')
+        self.logChannel = FakeChannel(id + 2, self)
+        self.channel = FakeChannel(id + 3, self)
+        self.roles = [self.muteRole]
+        self.channels = {self.logChannel.id: self.logChannel, self.channel.id: self.channel}
+
+    def get_role(self, roleID):
+        return self.muteRole if roleID == self.muteRole.id else None
+
+    def get_channel(self, channelID):
+        return self.channels.get(channelID)
+
+class FakeMessage:
+    # discord.py's Context reads the bot's connection state off the message
+    _state = None
+
+    def __init__(self, id, author, guild, content, created_at):
+        self.id = id
+        self.author = author
+        self.guild = guild
+        self.channel = guild.channel
+        self.content = content
+        self.created_at = created_at
+        self.attachments = []
+        self.reactions = []
+        self.jump_url = f"https://discord.com/channels/{guild.id}/{guild.channel.id}/{id}"
+
+class FakeReaction:
+    def __init__(self, message, emoji, count):
+        self.message = message
+        self.emoji = emoji
+        self.count = count
+        self.me = False
+
+class FakeContext:
+    def __init__(self, guild, author):
+        self.guild = guild
+        self.author = author
+        self.channel = guild.channel
+
+    async def send(self, content=None, **kwargs):
+        await FakeAPI.call()
+
+def load_bot(name, database):
+    # The bots read LaunchpadDatabase when they configure the pool at import time
+    os.environ['LaunchpadDatabase'] = database
+    module_name, path = BOT_MODULES[name]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def zipf_cumulative_weights(count, exponent):
+    # Rank r (1-based) gets weight 1 / r**exponent
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        mix[kind.strip()] = float(weight)
+    return mix
+
+def build_world(args, rng):
+    guilds = [FakeGuild(BASE_ID + 10 * index, f"guild-{index}") for index in range(args.guilds)]
+    joined = datetime(2024, 1, 1)
+    users = [FakeUser(BASE_ID + 10 * args.guilds + index, f"user-{index}", joined_at=joined + timedelta(minutes=index))
+             for index in range(args.users)]
+    # Who is most active is random, not simply the lowest IDs
+    rng.shuffle(guilds)
+    rng.shuffle(users)
+    return guilds, users
+
+def build_events(args, mix, guilds, users, rng):
+    """Pre-generates (kind, payload) for every event so nothing random happens while the load runs."""
+    guild_weights = zipf_cumulative_weights(len(guilds), args.guild_zipf)
+    user_weights = zipf_cumulative_weights(len(users), args.zipf)
+    kinds = list(mix)
+    kind_weights = list(itertools.accumulate(mix[kind] for kind in kinds))
+    moderator = FakeUser(BOT_USER_ID - 1, 'moderator')
+    created_at = datetime(2024, 6, 1)
+    messages = []
+    events = []
+    for index in range(args.events):
+        kind = rng.choices(kinds, cum_weights=kind_weights)[0]
+        guild = rng.choices(guilds, cum_weights=guild_weights)[0]
+        user = rng.choices(users, cum_weights=user_weights)[0]
+        if kind == 'message' or not messages:
+            message = FakeMessage(BASE_ID * 2 + index, user, guild, f"message {index} from {user.name}",
+                                  created_at + timedelta(seconds=index))
+            messages.append(message)
+            events.append(('message', (message,)))
+        elif kind == 'reaction':
+            # Recent messages collect the reactions
+            message = messages[-1 - min(len(messages) - 1, int(rng.expovariate(0.05)))]
+            reaction = FakeReaction(message, rng.choice(REACTION_EMOJI), rng.randint(1, 10))
+            events.append(('reaction', (reaction, user)))
+        else:
+            events.append(('moderate', (FakeContext(guild, moderator), rng.choice(MODERATION_ACTIONS), user)))
+    return events
+
+def handler_for(bot_module, kind):
+    if kind == 'message':
+        return bot_module.on_message
+    if kind == 'reaction':
+        return bot_module.on_reaction_add
+    if kind == 'moderate':
+        command = getattr(bot_module, 'moderate', None)
+        if command is None:
+            return None
+        # Straight to the command body: argument conversion and permission checks need a live guild
+        return lambda ctx, action, member: command.callback(ctx, action, member, reason="Load test")
+    return None
+
+async def measure_loop_lag(lags, stop, interval=LAG_INTERVAL):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - expected)
+
+async def run_load(bot_module, events, rate):
+    handlers = {kind: handler_for(bot_module, kind) for kind in {kind for kind, _ in events}}
+    latencies = {kind: [] for kind in handlers}
+    errors = {kind: 0 for kind in handlers}
+    first_error = {}
+
+    async def dispatch(kind, payload):
+        start = time.perf_counter_ns()
+        try:
+            await handlers[kind](*payload)
+        except Exception as e:
+            errors[kind] += 1
+            first_error.setdefault(kind, repr(e))
+        finally:
+            latencies[kind].append(time.perf_counter_ns() - start)
+
+    loop = asyncio.get_running_loop()
+    lags = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_loop_lag(lags, stop))
+    commits_before = getPool().stats['commits']
+
+    pending = set()
+    started = loop.time()
+    for index, (kind, payload) in enumerate(events):
+        if rate:
+            # Open loop: each event is due at its own time, however slow the earlier ones were
+            delay = started + index / rate - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif index % 100 == 0:
+            await asyncio.sleep(0)
+        task = asyncio.create_task(dispatch(kind, payload))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    dispatched = loop.time() - started
+    await asyncio.gather(*pending)
+    elapsed = loop.time() - started
+    commits = getPool().stats['commits'] - commits_before
+
+    stop.set()
+    await ticker
+    return {
+        'latencies': latencies,
+        'errors': errors,
+        'first_error': first_error,
+        'lags': lags,
+        'dispatch_seconds': dispatched,
+        'elapsed_seconds': elapsed,
+        'commits': commits,
+    }
+
+def percentile(sorted_samples, fraction):
+    # Nearest-rank percentile
+    if not sorted_samples:
+        return 0
+    return sorted_samples[max(1, math.ceil(round(fraction * len(sorted_samples), 9))) - 1]
+
+def summarize_ms(samples, scale):
+    ordered = sorted(samples)
+    summary = {'count': len(ordered), 'max_ms': ordered[-1] * scale if ordered else 0}
+    for fraction in PERCENTILES:
+        summary[f"p{int(fraction * 100)}_ms"] = percentile(ordered, fraction) * scale
+    return summary
+
+async def drive(args, bot_module, guilds, events):
+    FakeAPI.latency = args.api_latency
+    # Stands in for the logged-in account; process_commands and the suggestion tracker compare against it
+    bot_module.bot._connection.user = FakeUser(BOT_USER_ID, 'launchpad-load', bot=True)
+    FakeMessage._state = bot_module.bot._connection
+    await bot_module.db.run(createMany, 'Server',
+                            [(guild.id, guild.name, None, '!', 'en', 0, 0, guild.muteRole.id, guild.logChannel.id)
+                             for guild in guilds],
+                            'ON CONFLICT (ServerID) DO NOTHING')
+    # Starts the write-behind loops exactly as a real login would
+    await bot_module.on_ready()
+    result = await run_load(bot_module, events, args.rate)
+    # Whatever blocked the loop during the run, attributed by the bot's own loop monitor
+    result['stalls'] = bot_module.loopMonitor.worstCulprits(limit=10)
+    result['stall_threshold'] = bot_module.loopMonitor.threshold
+    bot_module.loopMonitor.stop()
+    # What is still buffered lands now, outside the measured window
+    await bot_module.activity.flush()
+    return result
+
+def report(args, result):
+    console = Console()
+    table = Table(title=f"Handler Latency ({args.bot} bot, {args.events:,} events, "
+                        f"{'unthrottled' if not args.rate else f'{args.rate:,.0f}/s target'})")
+    table.add_column("Event", justify="right", style="cyan", no_wrap=True)
+    table.add_column("Count", justify="right")
+    table.add_column("Errors", justify="right", style="red")
+    table.add_column("p50 (ms)", justify="right", style="green")
+    table.add_column("p95 (ms)", justify="right", style="green")
+    table.add_column("p99 (ms)", justify="right", style="yellow")
+    table.add_column("Max (ms)", justify="right", style="red")
+    handlers = {}
+    for kind, samples in result['latencies'].items():
+        summary = summarize_ms(samples, 1e-6)
+        summary['errors'] = result['errors'][kind]
+        handlers[kind] = summary
+        table.add_row(kind, f"{summary['count']:,}", f"{summary['errors']:,}", f"{summary['p50_ms']:.2f}",
+                      f"{summary['p95_ms']:.2f}", f"{summary['p99_ms']:.2f}", f"{summary['max_ms']:.2f}")
+    console.print(table)
+    for kind, error in result['first_error'].items():
+        console.print(f"[red]First {kind} error: {error}[/red]")
+
+    lag = summarize_ms(result['lags'], 1000)
+    elapsed = result['elapsed_seconds']
+    totals = {
+        'events_per_sec': args.events / elapsed if elapsed else 0,
+        'dispatch_seconds': result['dispatch_seconds'],
+        'elapsed_seconds': elapsed,
+        'commits': result['commits'],
+        'commits_per_sec': result['commits'] / elapsed if elapsed else 0,
+        'fake_api_calls': FakeAPI.calls,
+    }
+    table = Table(title="Throughput and Event Loop Lag")
+    table.add_column("Metric", justify="right", style="cyan", no_wrap=True)
+    table.add_column("Value", style="magenta")
+    table.add_row("Events/sec achieved", f"{totals['events_per_sec']:,.0f}")
+    table.add_row("Elapsed (seconds)", f"{elapsed:.2f}")
+    table.add_row("DB commits", f"{totals['commits']:,}")
+    table.add_row("DB commits/sec", f"{totals['commits_per_sec']:,.1f}")
+    table.add_row("Loop lag p50 / p99 / max (ms)", f"{lag['p50_ms']:.2f} / {lag['p99_ms']:.2f} / {lag['max_ms']:.2f}")
+    table.add_row("Fake Discord API calls", f"{FakeAPI.calls:,}")
+    console.print(table)
+
+    stalls = [{'kind': kind, 'name': name, 'count': count, 'total_ms': total * 1000, 'worst_ms': worst * 1000}
+              for kind, name, count, total, worst in result['stalls']]
+    if stalls:
+        table = Table(title=f"Loop Stalls over {result['stall_threshold'] * 1000:.0f} ms, by culprit")
+        table.add_column("Kind", style="cyan")
+        table.add_column("Name", style="cyan", no_wrap=True)
+        table.add_column("Stalls", justify="right")
+        table.add_column("Total (ms)", justify="right", style="yellow")
+        table.add_column("Worst (ms)", justify="right", style="red")
+        for stall in stalls:
+            table.add_row(stall['kind'], stall['name'], f"{stall['count']:,}", f"{stall['total_ms']:,.1f}",
+                          f"{stall['worst_ms']:,.1f}")
+        console.print(table)
+    return {'handlers': handlers, 'loop_lag': lag, 'totals': totals, 'stalls': stalls}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline load generator for the Launchpad bots")
+    parser.add_argument('--bot', choices=sorted(BOT_MODULES), default='framework', help="which bot's handlers to drive")
+    parser.add_argument('--events', type=int, default=20000, help="number of events to dispatch")
+    parser.add_argument('--rate', type=float, default=1000, help="target events per second (0 for as fast as possible)")
+    parser.add_argument('--users', type=int, default=5000, help="distinct users sending events")
+    parser.add_argument('--guilds', type=int, default=50, help="distinct guilds the events arrive in")
+    parser.add_argument('--zipf', type=float, default=1.1, help="Zipf exponent of user activity (0 for uniform)")
+    parser.add_argument('--guild-zipf', type=float, default=1.0, help="Zipf exponent of guild activity (0 for uniform)")
+    parser.add_argument('--mix', help="event weights, e.g. message=0.7,reaction=0.25,moderate=0.05")
+    parser.add_argument('--api-latency', type=float, default=0.0, help="seconds each faked Discord API call takes")
+    parser.add_argument('--seed', type=int, default=1234, help="seed for the generated world and event schedule")
+    parser.add_argument('--database', default='loadTest.db', help="database file the bot writes to")
+    parser.add_argument('--json', help="also write the results to this file")
+    parser.add_argument('--metrics', help="write the Prometheus metrics to this file after the run")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX[args.bot]
+    bot_module = load_bot(args.bot, args.database)
+    unsupported = [kind for kind in mix if handler_for(bot_module, kind) is None]
+    if unsupported:
+        sys.exit(f"The {args.bot} bot has no handler for: {', '.join(unsupported)}")
+
+    rng = random.Random(args.seed)
+    guilds, users = build_world(args, rng)
+    events = build_events(args, mix, guilds, users, rng)
+
+    if args.metrics:
+        bot_module.db.addShutdownHook(MetricsExporter(path=args.metrics).stop)
+
+    try:
+        result = asyncio.run(drive(args, bot_module, guilds, events))
+    finally:
+        # Runs the bot's shutdown hooks (buffered counters, starboard and vote tallies)
+        bot_module.db.shutdown()
+
+    summary = report(args, result)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'arguments': vars(args), 'mix': mix, **summary}, output, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -4,42 +4,75 @@ Testing Harness for CRUD Operations
 Author: Zakariya Masood
 
 This script creates a testing harness to evaluate the performance of CRUD (Create, Read, Update, Delete) operations
-on different tables using the functions provided in the `db_access_layer.py` module.
+on different tables using the functions provided in the `dbAccessLayer.py` module.
 
-The harness generates synthetic data for each table and performs a specified number of CRUD operations on each table.
-It measures the execution time, CPU usage, and memory usage for each set of operations.
+The benchmark suite (`--mode crud`) runs create/read/update/delete on every table plus the bot's hot paths
+(handleNewUser, the message/reaction counter flush and the moderation insert). Its datasets are generated up front
+from `--seed`, each scenario gets an untimed warmup pass, and every call is timed with `time.perf_counter_ns`.
 
-The performance results are displayed in a formatted table using the `rich` library, showing the time taken,
-CPU usage, and memory usage for each operation.
+The results are displayed in a formatted table using the `rich` library, showing p50/p95/p99/max latency and
+throughput per operation, and written as JSON to `--json` so runs can be compared.
 
 The script tests the performance with different numbers of operations: 1000, 10000, and 100000.
+It also compares point-read throughput of the pooled connections against opening a connection per call, and
+measures how long the asyncio event loop stalls during a write storm with blocking versus awaitable DB calls; the
+run exits non-zero unless the blocking path stalls the loop past the limit and the awaitable path never does.
+With `--mode bulk` it times the single-row CRUD loop against the batched createMany/readMany/updateMany/deleteMany
+variants on the same rows, and `--mode updates` times building UPDATE SQL per call against the cached statement
+registry. With `--mode profiles` it runs the User CRUD workload once per storage profile (PRAGMA preset) on a fresh
+database file so the presets can be compared at each operation count, and `--mode plans` runs
+EXPLAIN QUERY PLAN on the indexed lookups and exits non-zero if any of them stopped using its index.
+
+`--mode compare` is the regression gate: it reruns the scenarios in a stored results file (`--baseline`, e.g. an
+earlier `--json` output renamed) with the same seed, warmup and operation counts, `--trials` times. Per operation it
+tests the chosen `--metric` with a one-sided permutation test on the per-trial values, and exits non-zero when any
+operation is both more than `--tolerance` slower and significant at `--alpha` after a Holm-Bonferroni correction
+across every operation compared, so two dozen tests at once don't turn noise into regressions. Both the baseline and
+this run need at least 6 trials: with n per side the smallest p-value the test can produce is 1/C(2n, n), and it has
+to clear the strictest Holm threshold, `--alpha` divided by the number of operations (0.05 / 26 = 0.0019 for the
+default suite against 1/924 at n=6). Compare refuses to run when it can't, rather than pass every slowdown off as noise.
 
 Dependencies:
-- `db_access_layer.py`: Module containing the CRUD functions for the tables.
+- `dbAccessLayer.py`: Module containing the CRUD functions for the tables.
 - `rich`: Library for rich text formatting and table display.
 - `psutil`: Library for accessing system information and process utilities.
 - `logging`: Library for logging messages and exceptions.
 
 Usage:
-1. Ensure that the `db_access_layer.py` module is in the same directory as this script.
+1. Run it from a checkout of the repository; the `launchpad` package at the root is put on sys.path.
 2. Install the required dependencies (`rich`, `psutil`, and `logging`) if not already installed.
-3. Run the script using a Python interpreter.
+3. Run the script using a Python interpreter, optionally with `--mode`
+   (crud, pool, latency, bulk, updates, profiles, plans or all), `--operations` to pick the run sizes,
+   `--seed`, `--warmup`, `--trials` and `--json` for the benchmark suite, and `--baseline` for compare mode.
 4. The performance results will be displayed in the console, and any exceptions will be logged to a file.
 
 Note: This script assumes that the necessary tables are already created in the database.
 """
 
+import argparse
+import gc
+import itertools
+import json
+import math
+import os
+import sys
 import platform
 import time
+import asyncio
 import random
+import statistics
 import string
 import psutil
 import logging
 from rich import print
 from rich.console import Console
 from rich.table import Table
-from db_access_layer import *
-from create_tables import *
+import sqlite3
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from launchpad.dbAccessLayer import *
+from launchpad.createTables import createDatabaseTables
+from launchpad.asyncDbAccess import db
+from launchpad.caches import KnownUserCache
 
 # Configure logging
 logging.basicConfig(filename='testHarness.log', level=logging.ERROR,
@@ -89,245 +122,894 @@ def print_machine_specs():
 
     console.print(table)
 
+# Every dataset is generated from a seeded random.Random before timing starts, with timestamps
+# offset from a fixed base, so two runs with the same --seed issue exactly the same statements
+BENCHMARK_SEED = 1234
+BASE_TIMESTAMP = 1700000000
+WARMUP_OPERATIONS = 200
+# Users and guilds the per-table scenarios and the hot paths hang their rows off
+FIXTURE_USERS = 500
+FIXTURE_SERVERS = 20
+# Chat events folded into one ActivityCounter flush
+EVENTS_PER_FLUSH = 250
+PERCENTILES = (0.50, 0.95, 0.99)
+# The write storm runs with a full fsync per commit so the blocking path's cost is unmistakable
+STORM_PROFILE = 'durable'
+STORM_CALIBRATION_WRITES = 200
+
+def random_ids(rng, count):
+    # Distinct Discord-sized snowflakes
+    return rng.sample(range(10000000000000000, 99999999999999999), count)
+
+def random_text(rng, length):
+    return ''.join(rng.choices(string.ascii_letters + string.digits, k=length))
+
 # Function to generate random user data with exception handling
-def generate_user_data():
+def generate_user_data(rng=random, user_id=None):
     try:
-        user_id = random.randint(10000000000000000, 99999999999999999)
-        username = ''.join(random.choices(string.ascii_letters + string.digits, k=8))
-        avatar = ''.join(random.choices(string.ascii_letters + string.digits, k=16))
-        is_bot = random.choice([True, False])
-        joined_at = int(time.time())
+        user_id = user_id or rng.randint(10000000000000000, 99999999999999999)
+        username = random_text(rng, 8)
+        avatar = random_text(rng, 16)
+        is_bot = rng.choice([True, False])
+        joined_at = BASE_TIMESTAMP + rng.randint(0, 86400)
         return user_id, username, avatar, is_bot, joined_at
     except Exception as e:
         logging.error(f"Error generating user data: {str(e)}")
         return None
 
 # Function to generate random server data with exception handling
-def generate_server_data():
+def generate_server_data(rng=random, server_id=None):
     try:
-        server_id = random.randint(10000000000000000, 99999999999999999)
-        name = ''.join(random.choices(string.ascii_letters + string.digits, k=10))
-        icon = ''.join(random.choices(string.ascii_letters + string.digits, k=16))
-        prefix = random.choice(['!', '#', '$', '%'])
-        language = random.choice(['en', 'es', 'fr', 'de'])
-        mod_role = random.randint(10000000000000000, 99999999999999999)
-        admin_role = random.randint(10000000000000000, 99999999999999999)
-        mute_role = random.randint(10000000000000000, 99999999999999999)
-        log_channel = random.randint(10000000000000000, 99999999999999999)
+        server_id = server_id or rng.randint(10000000000000000, 99999999999999999)
+        name = random_text(rng, 10)
+        icon = random_text(rng, 16)
+        prefix = rng.choice(['!', '#', '$', '%'])
+        language = rng.choice(['en', 'es', 'fr', 'de'])
+        mod_role = rng.randint(10000000000000000, 99999999999999999)
+        admin_role = rng.randint(10000000000000000, 99999999999999999)
+        mute_role = rng.randint(10000000000000000, 99999999999999999)
+        log_channel = rng.randint(10000000000000000, 99999999999999999)
         return server_id, name, icon, prefix, language, mod_role, admin_role, mute_role, log_channel
     except Exception as e:
         logging.error(f"Error generating server data: {str(e)}")
         return None
 
 # Function to generate random reminder data with exception handling
-def generate_reminder_data(server_id, user_id):
+def generate_reminder_data(server_id, user_id, rng=random):
     try:
-        reminder_text = ''.join(random.choices(string.ascii_letters + string.digits, k=20))
-        remind_at = int(time.time()) + random.randint(60, 3600)
+        reminder_text = random_text(rng, 20)
+        remind_at = BASE_TIMESTAMP + rng.randint(60, 3600)
         return server_id, user_id, reminder_text, remind_at
     except Exception as e:
         logging.error(f"Error generating reminder data: {str(e)}")
         return None
 
 # Function to generate random moderation data with exception handling
-def generate_moderation_data(server_id, user_id, moderator_id):
+def generate_moderation_data(server_id, user_id, moderator_id, rng=random):
     try:
-        action = random.choice(['WARN', 'KICK', 'MUTE'])
-        reason = ''.join(random.choices(string.ascii_letters + string.digits, k=30))
-        created_at = int(time.time())
+        action = rng.choice(['WARN', 'KICK', 'MUTE'])
+        reason = random_text(rng, 30)
+        created_at = BASE_TIMESTAMP + rng.randint(0, 86400)
         return server_id, user_id, action, reason, moderator_id, created_at
     except Exception as e:
         logging.error(f"Error generating moderation data: {str(e)}")
         return None
 
 # Function to generate random suggestion data with exception handling
-def generate_suggestion_data(server_id, user_id):
+def generate_suggestion_data(server_id, user_id, rng=random):
     try:
-        suggestion_text = ''.join(random.choices(string.ascii_letters + string.digits, k=50))
-        message_id = random.randint(10000000000000000, 99999999999999999)
-        created_at = int(time.time())
+        suggestion_text = random_text(rng, 50)
+        message_id = rng.randint(10000000000000000, 99999999999999999)
+        created_at = BASE_TIMESTAMP + rng.randint(0, 86400)
         return server_id, user_id, suggestion_text, message_id, created_at
     except Exception as e:
         logging.error(f"Error generating suggestion data: {str(e)}")
         return None
 
 # Function to generate random starboard data with exception handling
-def generate_starboard_data(server_id):
+def generate_starboard_data(server_id, rng=random):
     try:
-        channel_id = random.randint(10000000000000000, 99999999999999999)
-        min_stars = random.randint(1, 10)
+        channel_id = rng.randint(10000000000000000, 99999999999999999)
+        min_stars = rng.randint(1, 10)
         return server_id, channel_id, min_stars
     except Exception as e:
         logging.error(f"Error generating starboard data: {str(e)}")
         return None
 
-# Function to perform CRUD operations and measure performance with exception handling
-def perform_crud_operations(num_operations):
+def build_dataset(num_operations, seed):
+    # All rows for one suite run; nothing in here is touched by the timed code except to read it
+    rng = random.Random(seed)
+    ids = iter(random_ids(rng, FIXTURE_USERS + FIXTURE_SERVERS + 2 * num_operations))
+    fixture_users = [generate_user_data(rng, next(ids)) for _ in range(FIXTURE_USERS)]
+    fixture_servers = [generate_server_data(rng, next(ids)) for _ in range(FIXTURE_SERVERS)]
+    user_ids = [user[0] for user in fixture_users]
+    server_ids = [server[0] for server in fixture_servers]
+
+    def member():
+        return rng.choice(server_ids), rng.choice(user_ids)
+
+    # Message and reaction events: each author is new to the bot the first time they appear
+    events = [(rng.choice(('message', 'reaction')), *member()) for _ in range(num_operations)]
+    return {
+        'fixture_users': fixture_users,
+        'fixture_servers': fixture_servers,
+        'users': [generate_user_data(rng, next(ids)) for _ in range(num_operations)],
+        'servers': [generate_server_data(rng, next(ids)) for _ in range(num_operations)],
+        'reminders': [generate_reminder_data(*member(), rng) for _ in range(num_operations)],
+        'moderations': [generate_moderation_data(*member(), rng.choice(user_ids), rng) for _ in range(num_operations)],
+        'suggestions': [generate_suggestion_data(*member(), rng) for _ in range(num_operations)],
+        'starboards': [generate_starboard_data(rng.choice(server_ids), rng) for _ in range(num_operations)],
+        'events': events,
+        'authors': {user[0]: user for user in fixture_users},
+    }
+
+def timed(samples, func, *args, **kwargs):
+    start = time.perf_counter_ns()
+    result = func(*args, **kwargs)
+    samples.append(time.perf_counter_ns() - start)
+    return result
+
+async def timed_async(samples, func, *args, **kwargs):
+    start = time.perf_counter_ns()
+    result = await func(*args, **kwargs)
+    samples.append(time.perf_counter_ns() - start)
+    return result
+
+def run_table_crud(rows, create, read, update, delete, changes, key=None):
+    # create -> read -> update -> delete per row; key(row, created) picks the row's key
+    samples = {'create': [], 'read': [], 'update': [], 'delete': []}
+    keys = []
+    for row in rows:
+        created = timed(samples['create'], create, *row)
+        keys.append(key(row, created) if key else created)
+    for row_key in keys:
+        timed(samples['read'], read, row_key)
+    for row_key in keys:
+        timed(samples['update'], update, row_key, **changes)
+    for row_key in keys:
+        timed(samples['delete'], delete, row_key)
+    return samples
+
+def scenario_users(data):
+    return run_table_crud(data['users'], createUser, readUser, updateUser, deleteUser, {'Username': 'updated_user'},
+                          key=lambda row, created: row[0])
+
+def scenario_servers(data):
+    return run_table_crud(data['servers'], createServer, readServer, updateServer, deleteServer, {'Name': 'updated_server'},
+                          key=lambda row, created: row[0])
+
+def scenario_reminders(data):
+    return run_table_crud(data['reminders'], createReminder, readReminder, updateReminder, deleteReminder,
+                          {'ReminderText': 'updated_reminder'})
+
+def scenario_moderations(data):
+    # create is the moderation insert hot path: the row, the Member summary and the User counter in one commit
+    return run_table_crud(data['moderations'], createModeration, readModeration, updateModeration, deleteModeration,
+                          {'Reason': 'updated_reason'})
+
+def scenario_suggestions(data):
+    return run_table_crud(data['suggestions'], createSuggestion, readSuggestion, updateSuggestion, deleteSuggestion,
+                          {'Status': 'approved'})
+
+def scenario_starboards(data):
+    return run_table_crud(data['starboards'], createStarboard, readStarboard, updateStarboard, deleteStarboard,
+                          {'MinStars': 5})
+
+async def run_chat_events(data):
+    # What on_message/on_reaction_add do per event: handleNewUser, then the in-memory counter,
+    # with the counters flushed every EVENTS_PER_FLUSH events the way ActivityCounter does
+    samples = {'handleNewUser': [], 'activity flush': []}
+    known_users = KnownUserCache()
+    pending = {}
+
+    async def handle_new_user(user_id, username, avatar, is_bot, joined_at):
+        if user_id in known_users:
+            return
+        if await db.users.ensure(user_id, username, avatar, is_bot, joined_at):
+            known_users.add(user_id)
+
+    for number, (kind, server_id, user_id) in enumerate(data['events'], 1):
+        if kind == 'message':
+            await timed_async(samples['handleNewUser'], handle_new_user, *data['authors'][user_id])
+        counts = pending.setdefault((server_id, user_id), [0, 0])
+        counts[0 if kind == 'message' else 1] += 1
+        if number % EVENTS_PER_FLUSH == 0 or number == len(data['events']):
+            rows = [(server_id, user_id, messages, reactions) for (server_id, user_id), (messages, reactions) in pending.items()]
+            pending.clear()
+            await timed_async(samples['activity flush'], db.run, incrementActivityCounters, rows)
+    return samples
+
+def scenario_chat_events(data):
+    return asyncio.run(run_chat_events(data))
+
+# Scenario name -> function(dataset) returning {operation: [latency ns, ...]}
+SCENARIOS = [
+    ("User", scenario_users),
+    ("Server", scenario_servers),
+    ("Reminders", scenario_reminders),
+    ("Moderations", scenario_moderations),
+    ("Suggestions", scenario_suggestions),
+    ("Starboards", scenario_starboards),
+    ("Chat events", scenario_chat_events),
+]
+
+def setup_fixture(data):
+    createUsers(data['fixture_users'])
+    createServers(data['fixture_servers'])
+
+def teardown_fixture(data):
+    # Leaves the database as it was so the next run (and the warmup before it) start from the same state
+    server_ids = [server[0] for server in data['fixture_servers']]
+    conn = connectDB()
+    try:
+        for table in ('Moderations', 'Member', 'Reminders', 'Suggestions', 'Starboards'):
+            for chunk in chunked(server_ids):
+                placeholders = ', '.join('?' for _ in chunk)
+                conn.execute(f"DELETE FROM {table} WHERE ServerID IN ({placeholders})", chunk)
+        conn.commit()
+    finally:
+        releaseDB(conn)
+    deleteUsers([user[0] for user in data['fixture_users']])
+    deleteServers(server_ids)
+
+def percentile(sorted_samples, fraction):
+    # Nearest-rank percentile
+    if not sorted_samples:
+        return 0
+    rank = max(1, math.ceil(round(fraction * len(sorted_samples), 9)))
+    return sorted_samples[rank - 1]
+
+def summarize(samples):
+    ordered = sorted(samples)
+    total_ns = sum(ordered)
+    summary = {
+        'count': len(ordered),
+        'mean_us': total_ns / len(ordered) / 1000 if ordered else 0,
+        'max_us': ordered[-1] / 1000 if ordered else 0,
+        # Operations per second of time spent inside the operation itself
+        'ops_per_sec': len(ordered) / (total_ns / 1e9) if total_ns else 0,
+    }
+    for fraction in PERCENTILES:
+        summary[f"p{int(fraction * 100)}_us"] = percentile(ordered, fraction) / 1000
+    return summary
+
+def run_suite(num_operations, seed=BENCHMARK_SEED, warmup=WARMUP_OPERATIONS):
+    """Runs every scenario on a seeded dataset and returns {scenario: {operation: summary}}.
+
+    Each scenario first runs once on a separate warmup dataset (untimed) so the page cache, the pool's
+    connections and their statement caches are warm before the measured pass.
+    """
+    results = {}
+    warmup_data = build_dataset(warmup, seed + 1) if warmup else None
+    data = build_dataset(num_operations, seed)
+    for name, scenario in SCENARIOS:
+        try:
+            if warmup_data:
+                setup_fixture(warmup_data)
+                scenario(warmup_data)
+                teardown_fixture(warmup_data)
+            setup_fixture(data)
+            gc.collect()
+            wall_start = time.perf_counter_ns()
+            cpu_start = time.process_time_ns()
+            samples = scenario(data)
+            cpu_ns = time.process_time_ns() - cpu_start
+            wall_ns = time.perf_counter_ns() - wall_start
+            teardown_fixture(data)
+            results[name] = {operation: summarize(values) for operation, values in samples.items()}
+            results[name]['_scenario'] = {'wall_seconds': wall_ns / 1e9, 'cpu_seconds': cpu_ns / 1e9}
+        except Exception as e:
+            logging.error(f"Error running {name} scenario: {str(e)}")
+    return results
+
+def aggregate_trials(trials):
+    # Median of each statistic across trials; the per-trial values stay in the run for compare mode
+    results = {}
+    for name, operations in trials[0].items():
+        results[name] = {}
+        for operation in operations:
+            summaries = [trial[name][operation] for trial in trials if operation in trial.get(name, {})]
+            results[name][operation] = {stat: statistics.median(summary[stat] for summary in summaries) for stat in summaries[0]}
+    return results
+
+def run_trials(num_operations, trials=1, seed=BENCHMARK_SEED, warmup=WARMUP_OPERATIONS):
+    # Every trial replays the same seeded dataset, so trial-to-trial spread is measurement noise
+    trial_results = [run_suite(num_operations, seed, warmup) for _ in range(trials)]
+    return {'operations': num_operations, 'results': aggregate_trials(trial_results), 'trials': trial_results}
+
+# Function to run the benchmark suite and show its per-operation latencies
+def perform_crud_operations(num_operations, seed=BENCHMARK_SEED, warmup=WARMUP_OPERATIONS, trials=1):
+    run = run_trials(num_operations, trials, seed, warmup)
+
+    console = Console()
+    title = f"Benchmark Suite ({num_operations} Operations, seed {seed}"
+    title += f", median of {trials} trials)" if trials > 1 else ")"
+    table = Table(title=title)
+    table.add_column("Scenario", justify="right", style="cyan", no_wrap=True)
+    table.add_column("Operation", style="magenta")
+    table.add_column("Count", justify="right")
+    table.add_column("p50 (µs)", justify="right", style="green")
+    table.add_column("p95 (µs)", justify="right", style="green")
+    table.add_column("p99 (µs)", justify="right", style="yellow")
+    table.add_column("Max (µs)", justify="right", style="red")
+    table.add_column("Ops/sec", justify="right", style="blue")
+    for name, operations in run['results'].items():
+        for operation, summary in operations.items():
+            if operation == '_scenario':
+                continue
+            table.add_row(name, operation, f"{summary['count']:,.0f}", f"{summary['p50_us']:,.1f}", f"{summary['p95_us']:,.1f}",
+                          f"{summary['p99_us']:,.1f}", f"{summary['max_us']:,.1f}", f"{summary['ops_per_sec']:,.0f}")
+    console.print(table)
+    return run
+
+def benchmark_metadata(args):
+    return {
+        'seed': args.seed,
+        'warmup': args.warmup,
+        'trials': args.trials,
+        'storage_profile': getPool().storageProfile,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'system': platform.system(),
+        'machine': platform.machine(),
+        'cpu_count': psutil.cpu_count(),
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+def write_results(path, metadata, runs):
+    with open(path, 'w') as output:
+        json.dump({'metadata': metadata, 'runs': runs}, output, indent=2)
+
+# Metadata that has to match for a baseline comparison to mean anything
+COMPARABLE_METADATA = ('storage_profile', 'python', 'sqlite', 'system', 'machine', 'cpu_count')
+# Exact permutation test up to this many splits, random permutations beyond it
+PERMUTATION_ROUNDS = 20000
+# Trials per side compare mode needs: 1/C(12, 6) = 0.0011 is the first minimum p-value under the default alpha of
+# 0.05 Holm-corrected for the suite's operations
+MIN_COMPARE_TRIALS = 6
+
+def slowdown(metric, baseline, current):
+    # Relative change where positive always means worse: latencies going up, throughput going down
+    if not baseline:
+        return 0.0
+    change = (current - baseline) / baseline
+    return -change if metric == 'ops_per_sec' else change
+
+def permutation_p_value(baseline, current, metric, seed=BENCHMARK_SEED):
+    """One-sided p-value that current is worse than baseline by chance alone.
+
+    The statistic is the difference of means; the trials are reshuffled between the two groups and p is
+    the share of shuffles that look at least as bad as what was measured.
+    """
+    pooled = list(baseline) + list(current)
+    size = len(current)
+
+    def worse(values):
+        chosen = sum(values) / size
+        rest = (sum(pooled) - sum(values)) / (len(pooled) - size)
+        return rest - chosen if metric == 'ops_per_sec' else chosen - rest
+
+    observed = worse(current)
+    if math.comb(len(pooled), size) <= PERMUTATION_ROUNDS:
+        splits = [[pooled[i] for i in chosen] for chosen in itertools.combinations(range(len(pooled)), size)]
+        return sum(worse(split) >= observed - 1e-12 for split in splits) / len(splits)
+    rng = random.Random(seed)
+    extreme = sum(worse(rng.sample(pooled, size)) >= observed - 1e-12 for _ in range(PERMUTATION_ROUNDS))
+    return (extreme + 1) / (PERMUTATION_ROUNDS + 1)
+
+def min_p_value(baseline_count, current_count):
+    # Smallest p-value permutation_p_value can return for these group sizes, reached when every current trial is worse
+    splits = math.comb(baseline_count + current_count, current_count)
+    return 1 / splits if splits <= PERMUTATION_ROUNDS else 1 / (PERMUTATION_ROUNDS + 1)
+
+def holm_adjust(p_values):
+    # Holm-Bonferroni adjusted p-values, in the order given; comparing them to alpha controls the chance of any
+    # false regression across the whole family. None (untestable) entries stay None and don't count as tests.
+    tested = sorted((p, index) for index, p in enumerate(p_values) if p is not None)
+    adjusted = [None] * len(p_values)
+    running = 0.0
+    for rank, (p, index) in enumerate(tested):
+        running = max(running, min(1.0, (len(tested) - rank) * p))
+        adjusted[index] = running
+    return adjusted
+
+def compare_operation(metric, baseline_trials, current_trials, tests, alpha):
+    # Returns (baseline median, current median, slowdown, raw p-value or None); None when, out of tests
+    # operations, even the most extreme split couldn't reach the strictest Holm threshold alpha / tests
+    baseline_median = statistics.median(baseline_trials)
+    current_median = statistics.median(current_trials)
+    change = slowdown(metric, baseline_median, current_median)
+    if min_p_value(len(baseline_trials), len(current_trials)) * tests > alpha:
+        return baseline_median, current_median, change, None
+    return baseline_median, current_median, change, permutation_p_value(baseline_trials, current_trials, metric)
+
+def compare_verdict(change, adjusted_p, tolerance, alpha):
+    if change > tolerance:
+        if adjusted_p is None:
+            # Too few trials for any result to reach alpha; saying "noise" would hide a real slowdown
+            return "UNREACHABLE"
+        return "REGRESSION" if adjusted_p <= alpha else "noise"
+    if change < -tolerance:
+        return "faster"
+    return "ok"
+
+def baseline_operations(baseline_run):
+    return [(scenario, operation) for scenario, operations in baseline_run['results'].items()
+            for operation in operations if operation != '_scenario']
+
+def trial_values(run, scenario, operation, metric):
+    # Older single-trial result files only have the aggregate
+    trials = run.get('trials') or [run['results']]
+    return [trial[scenario][operation][metric] for trial in trials if operation in trial.get(scenario, {})]
+
+# Function to rerun a stored baseline's scenarios and flag the operations that got significantly worse
+def compare_against_baseline(args):
+    with open(args.baseline) as source:
+        baseline = json.load(source)
+    baseline_metadata = baseline['metadata']
+    metadata = benchmark_metadata(args)
+    metadata['seed'] = baseline_metadata['seed']
+    metadata['warmup'] = baseline_metadata['warmup']
+
+    console = Console()
+    for key in COMPARABLE_METADATA:
+        if baseline_metadata.get(key) != metadata[key]:
+            console.print(f"[yellow]Baseline {key} was {baseline_metadata.get(key)!r}, this run is {metadata[key]!r}[/yellow]")
+
+    # Refuse up front rather than run every scenario and report nothing as significant
+    tests = sum(len(baseline_operations(run)) for run in baseline['runs'])
+    baseline_trials = min(len(run.get('trials') or [run['results']]) for run in baseline['runs'])
+    smallest = min_p_value(baseline_trials, args.trials)
+    if min(baseline_trials, args.trials) < MIN_COMPARE_TRIALS or smallest * tests > args.alpha:
+        console.print(f"[red]Compare needs at least {MIN_COMPARE_TRIALS} trials per side and a reachable alpha: "
+                      f"{args.baseline} has {baseline_trials}, this run has {args.trials}, and the smallest possible "
+                      f"p-value is {smallest:.4f} against alpha {args.alpha} Holm-corrected for {tests} operations "
+                      f"({args.alpha / tests:.4f}). Record the baseline and rerun with more --trials.[/red]")
+        return False
+
+    # Run everything first: the Holm correction needs every operation's p-value before any verdict
+    runs = []
+    rows = []
+    for index, baseline_run in enumerate(baseline['runs']):
+        run = run_trials(baseline_run['operations'], args.trials, metadata['seed'], metadata['warmup'])
+        runs.append(run)
+        for scenario, operation in baseline_operations(baseline_run):
+            current_trials = trial_values(run, scenario, operation, args.metric)
+            comparison = compare_operation(args.metric, trial_values(baseline_run, scenario, operation, args.metric),
+                                           current_trials, tests, args.alpha) if current_trials else None
+            rows.append((index, scenario, operation, comparison))
+    adjusted = holm_adjust([comparison[3] if comparison else None for _, _, _, comparison in rows])
+
+    regressions = 0
+    unreachable = 0
+    for index, baseline_run in enumerate(baseline['runs']):
+        table = Table(title=f"Baseline Comparison ({baseline_run['operations']} Operations, {args.metric}, "
+                            f"tolerance {args.tolerance:.0%}, alpha {args.alpha}, Holm over {tests})")
+        table.add_column("Scenario", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Operation", style="magenta")
+        table.add_column("Baseline", justify="right")
+        table.add_column("Current", justify="right")
+        table.add_column("Slowdown", justify="right", style="yellow")
+        table.add_column("p-value", justify="right", style="blue")
+        table.add_column("Holm p", justify="right", style="blue")
+        table.add_column("Verdict", justify="right")
+        for (run_index, scenario, operation, comparison), adjusted_p in zip(rows, adjusted):
+            if run_index != index:
+                continue
+            if comparison is None:
+                table.add_row(scenario, operation, "", "", "", "", "", "[red]MISSING[/red]")
+                regressions += 1
+                continue
+            baseline_value, current_value, change, p_value = comparison
+            verdict = compare_verdict(change, adjusted_p, args.tolerance, args.alpha)
+            if verdict == "REGRESSION":
+                regressions += 1
+                verdict = f"[red]{verdict}[/red]"
+            elif verdict == "UNREACHABLE":
+                # Some trials lacked this operation; a slowdown that can't be tested still fails the gate
+                unreachable += 1
+                verdict = f"[red]{verdict}[/red]"
+            table.add_row(scenario, operation, f"{baseline_value:,.1f}", f"{current_value:,.1f}", f"{change:+.1%}",
+                          "-" if p_value is None else f"{p_value:.4f}", "-" if adjusted_p is None else f"{adjusted_p:.4f}",
+                          verdict)
+        console.print(table)
+
+    write_results(args.json, metadata, runs)
+    if regressions:
+        console.print(f"[red]{regressions} operation(s) regressed against {args.baseline}[/red]")
+    if unreachable:
+        console.print(f"[red]{unreachable} operation(s) slowed past the tolerance with too few trials to reach "
+                      f"alpha {args.alpha}[/red]")
+    return regressions == 0 and unreachable == 0
+
+# Function to compare ops/sec of connect-per-call reads against pooled connections
+def benchmark_connection_pool(num_operations):
     try:
         console = Console()
-        table = Table(title=f"Performance Results ({num_operations} Operations)")
-        table.add_column("Operation", justify="right", style="cyan", no_wrap=True)
+        table = Table(title=f"Connection Pool Benchmark ({num_operations} Reads)")
+        table.add_column("Strategy", justify="right", style="cyan", no_wrap=True)
         table.add_column("Time (seconds)", style="magenta")
-        table.add_column("CPU Usage (%)", justify="right", style="green")
-        table.add_column("Memory Usage (MB)", justify="right", style="blue")
+        table.add_column("Ops/sec", justify="right", style="green")
 
-        # User CRUD operations
-        start_time = time.time()
-        cpu_percent_start = psutil.cpu_percent()
-        memory_usage_start = psutil.Process().memory_info().rss / 1024 / 1024
+        user_data = generate_user_data()
+        createUser(*user_data)
+        user_id = user_data[0]
+
+        # Before: what every accessor used to do, a fresh connection per call
+        start_time = time.perf_counter()
         for _ in range(num_operations):
-            user_data = generate_user_data()
-            if user_data:
-                create_user(*user_data)
-                user_id = user_data[0]
-                read_user(user_id)
-                update_user(user_id, username='updated_user')
-                delete_user(user_id)
-        end_time = time.time()
-        cpu_percent_end = psutil.cpu_percent()
-        memory_usage_end = psutil.Process().memory_info().rss / 1024 / 1024
-        execution_time = end_time - start_time
-        cpu_usage = cpu_percent_end - cpu_percent_start
-        memory_usage = memory_usage_end - memory_usage_start
-        table.add_row("User CRUD", f"{execution_time:.2f}", f"{cpu_usage:.2f}", f"{memory_usage:.2f}")
-
-        # Server CRUD operations
-        start_time = time.time()
-        cpu_percent_start = psutil.cpu_percent()
-        memory_usage_start = psutil.Process().memory_info().rss / 1024 / 1024
+            conn = sqlite3.connect(getPool().database)
+            try:
+                conn.execute("SELECT * FROM User WHERE UserID = ?", (user_id,)).fetchone()
+            finally:
+                conn.close()
+        unpooled_time = time.perf_counter() - start_time
+
+        # After: the accessor itself, running on the shared pool
+        start_time = time.perf_counter()
         for _ in range(num_operations):
-            server_data = generate_server_data()
-            if server_data:
-                create_server(*server_data)
-                server_id = server_data[0]
-                read_server(server_id)
-                update_server(server_id, name='updated_server')
-                delete_server(server_id)
-        end_time = time.time()
-        cpu_percent_end = psutil.cpu_percent()
-        memory_usage_end = psutil.Process().memory_info().rss / 1024 / 1024
-        execution_time = end_time - start_time
-        cpu_usage = cpu_percent_end - cpu_percent_start
-        memory_usage = memory_usage_end - memory_usage_start
-        table.add_row("Server CRUD", f"{execution_time:.2f}", f"{cpu_usage:.2f}", f"{memory_usage:.2f}")
-
-        # # Reminder CRUD operations
-        # start_time = time.time()
-        # cpu_percent_start = psutil.cpu_percent()
-        # memory_usage_start = psutil.Process().memory_info().rss / 1024 / 1024
-        # for _ in range(num_operations):
-        #     user_data = generate_user_data()
-        #     server_data = generate_server_data()
-        #     if user_data and server_data:
-        #         create_user(*user_data)
-        #         create_server(*server_data)
-        #         reminder_data = generate_reminder_data(server_data[0], user_data[0])
-        #         if reminder_data:
-        #             create_reminder(*reminder_data)
-        #             reminder_id = read_reminder(1)[0]
-        #             update_reminder(reminder_id, reminder_text='updated_reminder')
-        #             delete_reminder(reminder_id)
-        #         delete_user(user_data[0])
-        #         delete_server(server_data[0])
-        # end_time = time.time()
-        # cpu_percent_end = psutil.cpu_percent()
-        # memory_usage_end = psutil.Process().memory_info().rss / 1024 / 1024
-        # execution_time = end_time - start_time
-        # cpu_usage = cpu_percent_end - cpu_percent_start
-        # memory_usage = memory_usage_end - memory_usage_start
-        # table.add_row("Reminder CRUD", f"{execution_time:.2f}", f"{cpu_usage:.2f}", f"{memory_usage:.2f}")
-
-        # # Moderation CRUD operations
-        # start_time = time.time()
-        # cpu_percent_start = psutil.cpu_percent()
-        # memory_usage_start = psutil.Process().memory_info().rss / 1024 / 1024
-        # for _ in range(num_operations):
-        #     user_data = generate_user_data()
-        #     server_data = generate_server_data()
-        #     moderator_data = generate_user_data()
-        #     if user_data and server_data and moderator_data:
-        #         create_user(*user_data)
-        #         create_user(*moderator_data)
-        #         create_server(*server_data)
-        #         moderation_data = generate_moderation_data(server_data[0], user_data[0], moderator_data[0])
-        #         if moderation_data:
-        #             create_moderation(*moderation_data)
-        #             moderation_id = read_moderation(1)[0]
-        #             update_moderation(moderation_id, reason='updated_reason')
-        #             delete_moderation(moderation_id)
-        #         delete_user(user_data[0])
-        #         delete_user(moderator_data[0])
-        #         delete_server(server_data[0])
-        # end_time = time.time()
-        # cpu_percent_end = psutil.cpu_percent()
-        # memory_usage_end = psutil.Process().memory_info().rss / 1024 / 1024
-        # execution_time = end_time - start_time
-        # cpu_usage = cpu_percent_end - cpu_percent_start
-        # memory_usage = memory_usage_end - memory_usage_start
-        # table.add_row("Moderation CRUD", f"{execution_time:.2f}", f"{cpu_usage:.2f}", f"{memory_usage:.2f}")
-
-        # # Suggestion CRUD operations
-        # start_time = time.time()
-        # cpu_percent_start = psutil.cpu_percent()
-        # memory_usage_start = psutil.Process().memory_info().rss / 1024 / 1024
-        # for _ in range(num_operations):
-        #     user_data = generate_user_data()
-        #     server_data = generate_server_data()
-        #     if user_data and server_data:
-        #         create_user(*user_data)
-        #         create_server(*server_data)
-        #         suggestion_data = generate_suggestion_data(server_data[0], user_data[0])
-        #         if suggestion_data:
-        #             create_suggestion(*suggestion_data)
-        #             suggestion_id = read_suggestion(1)[0]
-        #             update_suggestion(suggestion_id, status='approved')
-        #             delete_suggestion(suggestion_id)
-        #         delete_user(user_data[0])
-        #         delete_server(server_data[0])
-        # end_time = time.time()
-        # cpu_percent_end = psutil.cpu_percent()
-        # memory_usage_end = psutil.Process().memory_info().rss / 1024 / 1024
-        # execution_time = end_time - start_time
-        # cpu_usage = cpu_percent_end - cpu_percent_start
-        # memory_usage = memory_usage_end - memory_usage_start
-        # table.add_row("Suggestion CRUD", f"{execution_time:.2f}", f"{cpu_usage:.2f}", f"{memory_usage:.2f}")
-
-        # # Starboard CRUD operations
-        # start_time = time.time()
-        # cpu_percent_start = psutil.cpu_percent()
-        # memory_usage_start = psutil.Process().memory_info().rss / 1024 / 1024
-        # for _ in range(num_operations):
-        #     server_data = generate_server_data()
-        #     if server_data:
-        #         create_server(*server_data)
-        #         starboard_data = generate_starboard_data(server_data[0])
-        #         if starboard_data:
-        #             create_starboard(*starboard_data)
-        #             star_id = read_starboard(1)[0]
-        #             update_starboard(star_id, min_stars=5)
-        #             delete_starboard(star_id)
-        #         delete_server(server_data[0])
-        # end_time = time.time()
-        # cpu_percent_end = psutil.cpu_percent()
-        # memory_usage_end = psutil.Process().memory_info().rss / 1024 / 1024
-        # execution_time = end_time - start_time
-        # cpu_usage = cpu_percent_end - cpu_percent_start
-        # memory_usage = memory_usage_end - memory_usage_start
-        # table.add_row("Starboard CRUD", f"{execution_time:.2f}", f"{cpu_usage:.2f}", f"{memory_usage:.2f}")
+            readUser(user_id)
+        pooled_time = time.perf_counter() - start_time
+
+        deleteUser(user_id)
 
+        table.add_row("Connect per call", f"{unpooled_time:.2f}", f"{num_operations / unpooled_time:,.0f}")
+        table.add_row("Pooled", f"{pooled_time:.2f}", f"{num_operations / pooled_time:,.0f}")
         console.print(table)
     except Exception as e:
-        logging.error(f"Error performing CRUD operations: {str(e)}")
+        logging.error(f"Error benchmarking connection pool: {str(e)}")
+
+# Coroutine that wakes up every interval and records how late it was scheduled
+async def measure_loop_lag(lags, stop, interval=0.005):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - expected)
+
+async def run_write_storm(num_writes, use_executor, wave_size):
+    user_data = generate_user_data()
+    createUser(*user_data)
+    user_id = user_data[0]
+
+    lags = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_loop_lag(lags, stop))
+    await asyncio.sleep(0.01)
+
+    async def blocking_handler():
+        # What the handlers used to do: commit on the event loop thread
+        incrementUserMessages(user_id)
+
+    async def awaitable_handler():
+        await db.users.incrementMessages(user_id)
+
+    # Handlers arrive in bursts of wave_size in one loop iteration, the way a busy gateway delivers them;
+    # the next burst comes once this one is handled, so the storm never piles up unboundedly in memory
+    handler = awaitable_handler if use_executor else blocking_handler
+    start_time = time.perf_counter()
+    for first in range(0, num_writes, wave_size):
+        await asyncio.gather(*(handler() for _ in range(min(wave_size, num_writes - first))))
+    elapsed = time.perf_counter() - start_time
+
+    stop.set()
+    await ticker
+    deleteUser(user_id)
+    return elapsed, lags
+
+def storm_wave_size(max_lag_ms, calibration_writes=STORM_CALIBRATION_WRITES):
+    # Handlers per burst for the blocking path to hold the loop for 1.5x max_lag_ms at this machine's commit cost
+    user_data = generate_user_data()
+    createUser(*user_data)
+    start_time = time.perf_counter()
+    for _ in range(calibration_writes):
+        incrementUserMessages(user_data[0])
+    per_write = (time.perf_counter() - start_time) / calibration_writes
+    deleteUser(user_data[0])
+    return max(1, math.ceil(1.5 * max_lag_ms / 1000 / per_write))
+
+# Function to check the event loop stays responsive while handlers write to the database.
+# Both strategies get the same storm on a synchronous=FULL ('durable') pool, where a commit costs far more than handing
+# one to the executor; the check passes only if the blocking path breaks max_lag_ms and the awaitable path never does.
+def benchmark_event_loop_latency(num_writes, max_lag_ms=50):
+    passed = True
+    profile = getPool().storageProfile
+    try:
+        console = Console()
+        configurePool(storageProfile=STORM_PROFILE)
+        wave_size = storm_wave_size(max_lag_ms)
+        num_writes = max(num_writes, wave_size)
+        table = Table(title=f"Event Loop Lag During Write Storm ({num_writes} Writes, {wave_size} per Burst)")
+        table.add_column("Strategy", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Time (seconds)", style="magenta")
+        table.add_column("Max Lag (ms)", justify="right", style="green")
+        table.add_column("p99 Lag (ms)", justify="right", style="blue")
+        table.add_column(f"Responsive (max <{max_lag_ms} ms)", justify="right", style="yellow")
+        table.add_column("Result", justify="right", style="green")
+
+        for label, use_executor in (("Blocking", False), ("Awaitable", True)):
+            # Full collections would otherwise rescan the harness's own datasets mid-storm and show up as lag
+            gc.collect()
+            gc.freeze()
+            try:
+                elapsed, lags = asyncio.run(run_write_storm(num_writes, use_executor, wave_size))
+            finally:
+                gc.unfreeze()
+            max_lag = max(lags, default=0) * 1000
+            p99_lag = sorted(lags)[int(0.99 * (len(lags) - 1))] * 1000 if lags else 0
+            responsive = max_lag < max_lag_ms
+            # Only the awaitable path should keep the loop responsive
+            ok = responsive == use_executor
+            passed = passed and ok
+            table.add_row(label, f"{elapsed:.2f}", f"{max_lag:.2f}", f"{p99_lag:.2f}",
+                          "yes" if responsive else "no", "ok" if ok else "FAIL")
+        console.print(table)
+    except Exception as e:
+        logging.error(f"Error benchmarking event loop latency: {str(e)}")
+        passed = False
+    finally:
+        configurePool(storageProfile=profile)
+    return passed
+
+# Function to compare the single-row CRUD loop with the bulk variants on the same rows
+def benchmark_bulk_operations(num_operations):
+    try:
+        console = Console()
+        table = Table(title=f"Bulk vs Single-Row CRUD ({num_operations} Rows)")
+        table.add_column("Table", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Single-row (seconds)", style="magenta")
+        table.add_column("Bulk (seconds)", style="blue")
+        table.add_column("Speedup", justify="right", style="green")
+
+        # User: the loop from perform_crud_operations against createUsers/readUsers/updateUsers/deleteUsers
+        users = [generate_user_data() for _ in range(num_operations)]
+        user_ids = [user_data[0] for user_data in users]
+
+        start_time = time.perf_counter()
+        for user_data in users:
+            createUser(*user_data)
+            readUser(user_data[0])
+            updateUser(user_data[0], username='updated_user')
+            deleteUser(user_data[0])
+        single_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        createUsers(users)
+        readUsers(user_ids)
+        updateUsers({user_id: {'Username': 'updated_user'} for user_id in user_ids})
+        deleteUsers(user_ids)
+        bulk_time = time.perf_counter() - start_time
+        table.add_row("User", f"{single_time:.2f}", f"{bulk_time:.2f}", f"{single_time / bulk_time:.1f}x")
+
+        # Moderations: inserts only, e.g. importing moderation history
+        server_id, user_id, moderator_id = (random.randint(10000000000000000, 99999999999999999) for _ in range(3))
+        moderations = [generate_moderation_data(server_id, user_id, moderator_id) for _ in range(num_operations)]
+
+        start_time = time.perf_counter()
+        for moderation_data in moderations:
+            createModeration(*moderation_data)
+        single_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        createModerations(moderations)
+        bulk_time = time.perf_counter() - start_time
+        table.add_row("Moderations (insert)", f"{single_time:.2f}", f"{bulk_time:.2f}", f"{single_time / bulk_time:.1f}x")
+
+        conn = connectDB()
+        try:
+            conn.execute("DELETE FROM Moderations WHERE ServerID = ?", (server_id,))
+            conn.commit()
+        finally:
+            releaseDB(conn)
+
+        console.print(table)
+    except Exception as e:
+        logging.error(f"Error benchmarking bulk operations: {str(e)}")
+
+# Function to time the UPDATE path: building the SQL per call versus the statement registry
+def benchmark_update_path(num_operations):
+    try:
+        console = Console()
+        table = Table(title=f"UPDATE Statement Path ({num_operations} Updates)")
+        table.add_column("Strategy", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Time (seconds)", style="magenta")
+        table.add_column("Updates/sec", justify="right", style="green")
+        table.add_column("Registry Hit Rate", justify="right", style="yellow")
+
+        users = [generate_user_data() for _ in range(100)]
+        createUsers(users)
+        # Alternate column sets the way command handlers do
+        changes = [{'Username': 'updated_user'}, {'Avatar': 'updated_avatar', 'Username': 'updated_user'}, {'Warns': 1}]
+        workload = [(users[i % len(users)][0], changes[i % len(changes)]) for i in range(num_operations)]
+
+        # One transaction per strategy so statement preparation, not the commit, is what gets timed
+        def legacy_update(cursor, user_id, kwargs):
+            setClause = ', '.join(f"{k} = ?" for k in kwargs)
+            values = list(kwargs.values()) + [user_id]
+            cursor.execute(f"UPDATE User SET {setClause} WHERE UserID = ?", values)
+
+        def registry_update(cursor, user_id, kwargs):
+            sql, values = updateStatement('User', user_id, kwargs)
+            cursor.execute(sql, values)
+
+        strategies = [
+            ("f-string, no statement cache", legacy_update, 0),
+            ("f-string", legacy_update, STATEMENT_CACHE_SIZE),
+            ("Registry", registry_update, STATEMENT_CACHE_SIZE),
+        ]
+        for label, update, cache_size in strategies:
+            conn = sqlite3.connect(DATABASE, cached_statements=cache_size)
+            applyStorageProfile(conn, STORAGE_PROFILE)
+            before = statements.stats()
+            try:
+                cursor = conn.cursor()
+                start_time = time.perf_counter()
+                for user_id, kwargs in workload:
+                    update(cursor, user_id, kwargs)
+                conn.commit()
+                execution_time = time.perf_counter() - start_time
+            finally:
+                conn.close()
+            after = statements.stats()
+            lookups = (after['hits'] + after['misses']) - (before['hits'] + before['misses'])
+            hit_rate = f"{(after['hits'] - before['hits']) / lookups:.1%}" if lookups else "-"
+            table.add_row(label, f"{execution_time:.2f}", f"{num_operations / execution_time:,.0f}", hit_rate)
+
+        deleteUsers([user_data[0] for user_data in users])
+        console.print(table)
+    except Exception as e:
+        logging.error(f"Error benchmarking update path: {str(e)}")
+
+# Function to compare the storage profiles on the same User CRUD workload
+def compare_storage_profiles(num_operations, profiles=('legacy', 'durable', 'balanced', 'throughput')):
+    try:
+        console = Console()
+        table = Table(title=f"Storage Profile Comparison ({num_operations} Operations)")
+        table.add_column("Profile", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Time (seconds)", style="magenta")
+        table.add_column("Ops/sec", justify="right", style="green")
+
+        # Generate the data up front so only database work is timed
+        users = [generate_user_data() for _ in range(num_operations)]
+
+        for profile in profiles:
+            database = f"profile_{profile}.db"
+            remove_database_files(database)
+            createDatabaseTables(database, profile)
+            configurePool(database=database, storageProfile=profile)
+
+            start_time = time.perf_counter()
+            for user_data in users:
+                createUser(*user_data)
+                user_id = user_data[0]
+                readUser(user_id)
+                updateUser(user_id, username='updated_user')
+                deleteUser(user_id)
+            execution_time = time.perf_counter() - start_time
+
+            closeDB()
+            remove_database_files(database)
+            # Four statements per generated user
+            table.add_row(profile, f"{execution_time:.2f}", f"{num_operations * 4 / execution_time:,.0f}")
+
+        configurePool(database=DATABASE, storageProfile=STORAGE_PROFILE)
+        console.print(table)
+    except Exception as e:
+        logging.error(f"Error comparing storage profiles: {str(e)}")
+
+def remove_database_files(database):
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(database + suffix):
+            os.remove(database + suffix)
+
+# Indexed lookups in dbAccessLayer and the index each one must be planned with
+QUERY_PLAN_EXPECTATIONS = [
+    ("Due reminders", DUE_REMINDERS_SQL, (0, 10), "idx_Reminders_Due"),
+    ("Upcoming reminders", UPCOMING_REMINDERS_SQL, (0, 0, 10), "idx_Reminders_Due"),
+    ("User moderations", USER_MODERATIONS_SQL, (1, 1, 10), "idx_Moderations_ServerUser"),
+    ("Moderation history page", MODERATION_HISTORY_SQL, (1, 1, '2024-01-01', 1, 10), "idx_Moderations_ServerUser"),
+    ("User moderations (all servers)", USER_MODERATIONS_ALL_SERVERS_SQL, (1, 10), "idx_Moderations_User"),
+    ("Pending suggestions", PENDING_SUGGESTIONS_SQL, (1, 10), "idx_Suggestions_Pending"),
+    ("Suggestion by message", SUGGESTION_BY_MESSAGE_SQL, (1,), "idx_Suggestions_Message"),
+    ("Server starboards", SERVER_STARBOARDS_SQL, (1,), "idx_Starboards_Server"),
+    ("Top members by messages", TOP_MEMBERS_SQL['messages'], (1, 10), "idx_Member_Messages"),
+    ("Top members by reactions", TOP_MEMBERS_SQL['reactions'], (1, 10), "idx_Member_Reactions"),
+]
+
+# Function to check every indexed lookup still uses its index
+def check_query_plans():
+    console = Console()
+    table = Table(title="Query Plan Check")
+    table.add_column("Query", justify="right", style="cyan", no_wrap=True)
+    table.add_column("Expected Index", style="magenta")
+    table.add_column("Plan", style="blue")
+    table.add_column("Result", justify="right", style="green")
+
+    passed = True
+    conn = connectDB()
+    try:
+        for label, sql, params, index in QUERY_PLAN_EXPECTATIONS:
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+            ok = any(f"INDEX {index}" in detail for detail in plan)
+            passed = passed and ok
+            table.add_row(label, index, "; ".join(plan), "ok" if ok else "FAIL")
+    except Exception as e:
+        logging.error(f"Error checking query plans: {str(e)}")
+        passed = False
+    finally:
+        releaseDB(conn)
+
+    console.print(table)
+    return passed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Launchpad database performance harness")
+    parser.add_argument('--mode', choices=['crud', 'pool', 'latency', 'bulk', 'updates', 'profiles', 'plans', 'compare', 'all'],
+                        default='all', help="which benchmark to run; compare is not part of all")
+    parser.add_argument('--operations', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="number of operations per run")
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED,
+                        help="seed for every generated dataset")
+    parser.add_argument('--warmup', type=int, default=WARMUP_OPERATIONS,
+                        help="operations per scenario run untimed before each measured pass (0 to skip)")
+    parser.add_argument('--json', default='benchmarkResults.json',
+                        help="where to write the benchmark suite's results")
+    parser.add_argument('--trials', type=int, default=1,
+                        help="times to repeat the benchmark suite per operation count (compare mode needs at least 6)")
+    parser.add_argument('--baseline', default='benchmarkBaseline.json',
+                        help="results file compare mode reruns and checks against")
+    parser.add_argument('--metric', choices=['p50_us', 'p95_us', 'p99_us', 'mean_us', 'ops_per_sec'], default='p50_us',
+                        help="per-operation statistic compare mode tests")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="relative slowdown compare mode accepts before calling it a regression")
+    parser.add_argument('--alpha', type=float, default=0.05,
+                        help="significance level a slowdown must reach to count as a regression, Holm-corrected across operations")
+    return parser.parse_args()
+
+args = parse_args()
+# The remaining benchmarks draw from the module-level generator
+random.seed(args.seed)
 
 # Invoke the function to create the tables
 try:
-    create_manobloom_tables()
+    createDatabaseTables()
 except Exception as e:
     logging.error(f"Error creating tables: {str(e)}")
 
 print_machine_specs()
 
+plans_ok = True
+latency_ok = True
+if args.mode in ('plans', 'all'):
+    plans_ok = check_query_plans()
+
+if args.mode == 'compare':
+    # Reruns the baseline's operation counts with its seed and warmup, ignoring --operations
+    compare_ok = compare_against_baseline(args)
+    db.shutdown()
+    sys.exit(0 if compare_ok else 1)
+
+suite_runs = []
+
 # Test with different number of operations
-perform_crud_operations(1000)
-perform_crud_operations(10000)
-perform_crud_operations(100000)
\ No newline at end of file
+for num_operations in args.operations:
+    if args.mode in ('crud', 'all'):
+        suite_runs.append(perform_crud_operations(num_operations, args.seed, args.warmup, args.trials))
+    if args.mode in ('pool', 'all'):
+        benchmark_connection_pool(num_operations)
+    if args.mode in ('latency', 'all'):
+        latency_ok = benchmark_event_loop_latency(num_operations) and latency_ok
+    if args.mode in ('bulk', 'all'):
+        benchmark_bulk_operations(num_operations)
+    if args.mode in ('updates', 'all'):
+        benchmark_update_path(num_operations)
+    if args.mode in ('profiles', 'all'):
+        compare_storage_profiles(num_operations)
+
+db.shutdown()
+
+if suite_runs:
+    write_results(args.json, benchmark_metadata(args), suite_runs)
+
+if not (plans_ok and latency_ok):
+    sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,5 @@
+"""Shared database and bot-feature layer used by both Launchpad bots.
+
+Import the modules you need (launchpad.asyncDbAccess, launchpad.activityCounters, ...); pick the
+database file with launchpad.connection.configurePool(database=...) before creating tables.
+"""
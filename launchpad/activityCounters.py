@@ -0,0 +1,88 @@
+import asyncio
+from collections import defaultdict
+from discord.ext import tasks
+
+from . import dbAccessLayer
+
+# Write-behind aggregation of the per-message / per-reaction counters on User (global) and
+# Member (per guild). Handlers only bump an in-memory tally keyed by (serverID, userID); a
+# tasks.loop flushes all pending increments in one commit, or earlier once maxPending events pile up.
+
+FLUSH_INTERVAL = 5.0
+MAX_PENDING = 500
+
+MESSAGES = 0
+REACTIONS = 1
+
+class ActivityCounter:
+    def __init__(self, database, flushInterval=FLUSH_INTERVAL, maxPending=MAX_PENDING):
+        self.database = database
+        self.maxPending = maxPending
+        self.pending = defaultdict(lambda: [0, 0])
+        self.pendingEvents = 0
+        self.flushLock = None
+        self.sizeFlush = None
+        self.flushListeners = []
+        self.stats = {'events': 0, 'flushes': 0, 'rows': 0, 'failures': 0}
+
+        self.flushLoop = tasks.loop(seconds=flushInterval)(self.flush)
+        # Whatever is still buffered when the bot stops is written synchronously
+        database.addShutdownHook(self.flushNow)
+
+    def addFlushListener(self, func):
+        # func(totals) gets the new (serverID, userID, TotalMessages, TotalReactions) of every
+        # Member row a flush touched, e.g. to keep a leaderboard current
+        self.flushListeners.append(func)
+
+    def start(self):
+        if not self.flushLoop.is_running():
+            self.flushLoop.start()
+
+    # serverID is None for DMs, which only count towards the User totals
+    def addMessage(self, userID, serverID=None):
+        self.add(serverID, userID, MESSAGES)
+
+    def addReaction(self, userID, serverID=None):
+        self.add(serverID, userID, REACTIONS)
+
+    def add(self, serverID, userID, counter, amount=1):
+        self.pending[(serverID, userID)][counter] += amount
+        self.pendingEvents += amount
+        self.stats['events'] += amount
+        if self.pendingEvents >= self.maxPending and (self.sizeFlush is None or self.sizeFlush.done()):
+            self.sizeFlush = asyncio.ensure_future(self.flush())
+
+    def drain(self):
+        pending, self.pending = self.pending, defaultdict(lambda: [0, 0])
+        self.pendingEvents = 0
+        return [(serverID, userID, messages, reactions) for (serverID, userID), (messages, reactions) in pending.items()]
+
+    def restore(self, rows):
+        # Put back increments from a failed flush so the next one retries them
+        for serverID, userID, messages, reactions in rows:
+            self.pending[(serverID, userID)][MESSAGES] += messages
+            self.pending[(serverID, userID)][REACTIONS] += reactions
+            self.pendingEvents += messages + reactions
+
+    async def flush(self):
+        # Created lazily so the lock binds to the loop bot.run starts
+        if self.flushLock is None:
+            self.flushLock = asyncio.Lock()
+        async with self.flushLock:
+            rows = self.drain()
+            if not rows:
+                return
+            totals = await self.database.run(dbAccessLayer.incrementActivityCounters, rows)
+            if totals is not None:
+                self.stats['flushes'] += 1
+                self.stats['rows'] += len(rows)
+                for listener in self.flushListeners:
+                    listener(totals)
+            else:
+                self.stats['failures'] += 1
+                self.restore(rows)
+
+    def flushNow(self):
+        rows = self.drain()
+        if rows and dbAccessLayer.incrementActivityCounters(rows) is None:
+            self.restore(rows)
@@ -0,0 +1,198 @@
+import asyncio
+import functools
+import contextvars
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+from . import dbAccessLayer
+
+# Awaitable front end for dbAccessLayer.
+# Every call is shipped to one dedicated DB thread, so coroutines never block the
+# discord.py event loop on SQLite I/O and writes are applied in the order they were awaited.
+
+# Set while the current task is inside db.transaction()
+inTransaction = contextvars.ContextVar('inTransaction', default=False)
+
+class AsyncTransaction:
+    # async with db.transaction(): drives dbAccessLayer.transaction() on the DB thread, so
+    # every db call awaited inside shares its connection and commit
+
+    def __init__(self, database):
+        self.database = database
+        self.context = None
+        self.token = None
+
+    async def __aenter__(self):
+        if not inTransaction.get():
+            # Hold other tasks' statements back until this transaction finishes
+            await self.database.getTransactionLock().acquire()
+            self.token = inTransaction.set(True)
+        self.context = dbAccessLayer.transaction()
+        try:
+            return await self.database.submit(self.context.__enter__)
+        except BaseException:
+            self.release()
+            raise
+
+    async def __aexit__(self, excType, exc, tb):
+        try:
+            return await self.database.submit(self.context.__exit__, excType, exc, tb)
+        finally:
+            self.release()
+
+    def release(self):
+        if self.token is not None:
+            inTransaction.reset(self.token)
+            self.token = None
+            self.database.getTransactionLock().release()
+
+class AsyncTable:
+    def __init__(self, database, table, create, read, update, delete, createMany=None, **extra):
+        self.database = database
+        self.table = table
+        self.createFunc = create
+        # Tables whose create keeps other tables in step (Moderations) need a matching bulk create
+        self.createManyFunc = createMany or functools.partial(dbAccessLayer.createMany, table)
+        self.readFunc = read
+        self.updateFunc = update
+        self.deleteFunc = delete
+        self.writeListeners = []
+        # Table specific helpers, e.g. db.users.incrementMessages(...)
+        for name, func in extra.items():
+            setattr(self, name, functools.partial(database.run, func))
+
+    def addWriteListener(self, func):
+        # func(key) is called after every create/update/delete, e.g. to invalidate a cache
+        self.writeListeners.append(func)
+
+    def notifyWrite(self, key):
+        for listener in self.writeListeners:
+            listener(key)
+
+    async def create(self, *args, **kwargs):
+        result = await self.database.run(self.createFunc, *args, **kwargs)
+        if args:
+            self.notifyWrite(args[0])
+        return result
+
+    async def get(self, key):
+        return await self.database.run(self.readFunc, key)
+
+    async def update(self, key, **kwargs):
+        result = await self.database.run(self.updateFunc, key, **kwargs)
+        self.notifyWrite(key)
+        return result
+
+    async def delete(self, key):
+        result = await self.database.run(self.deleteFunc, key)
+        self.notifyWrite(key)
+        return result
+
+    # Bulk variants: one DB thread hop and one transaction for the whole batch
+
+    async def createMany(self, rows):
+        rows = list(rows)
+        result = await self.database.run(self.createManyFunc, rows)
+        for row in rows:
+            self.notifyWrite(row[0])
+        return result
+
+    async def getMany(self, keys):
+        return await self.database.run(dbAccessLayer.readMany, self.table, list(keys))
+
+    async def updateMany(self, changes):
+        result = await self.database.run(dbAccessLayer.updateMany, self.table, changes)
+        for key in changes:
+            self.notifyWrite(key)
+        return result
+
+    async def deleteMany(self, keys):
+        keys = list(keys)
+        result = await self.database.run(dbAccessLayer.deleteMany, self.table, keys)
+        for key in keys:
+            self.notifyWrite(key)
+        return result
+
+class AsyncDatabase:
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='launchpad-db')
+        self.shutdownHooks = []
+        self.transactionLock = None
+
+        self.users = AsyncTable(self, 'User', dbAccessLayer.createUser, dbAccessLayer.readUser,
+                                dbAccessLayer.updateUser, dbAccessLayer.deleteUser,
+                                ensure=dbAccessLayer.ensureUser,
+                                ensureMany=dbAccessLayer.ensureUsers,
+                                incrementMessages=dbAccessLayer.incrementUserMessages,
+                                incrementReactions=dbAccessLayer.incrementUserReactions,
+                                incrementCounters=dbAccessLayer.incrementUserCounters,
+                                incrementModerationCount=dbAccessLayer.incrementUserModerationCount)
+        # Member rows have a (ServerID, UserID) key, so they get helpers rather than an AsyncTable
+        self.members = SimpleNamespace(
+            ensure=functools.partial(self.run, dbAccessLayer.ensureMember),
+            ensureMany=functools.partial(self.run, dbAccessLayer.ensureMembers),
+            get=functools.partial(self.run, dbAccessLayer.readMember),
+            delete=functools.partial(self.run, dbAccessLayer.deleteMember),
+            incrementCounters=functools.partial(self.run, dbAccessLayer.incrementMemberCounters),
+            top=functools.partial(self.run, dbAccessLayer.readTopMembers),
+        )
+        self.servers = AsyncTable(self, 'Server', dbAccessLayer.createServer, dbAccessLayer.readServer,
+                                  dbAccessLayer.updateServer, dbAccessLayer.deleteServer)
+        self.reminders = AsyncTable(self, 'Reminders', dbAccessLayer.createReminder, dbAccessLayer.readReminder,
+                                    dbAccessLayer.updateReminder, dbAccessLayer.deleteReminder,
+                                    due=dbAccessLayer.readDueReminders,
+                                    upcoming=dbAccessLayer.readUpcomingReminders,
+                                    markDelivered=dbAccessLayer.markRemindersDelivered)
+        self.moderations = AsyncTable(self, 'Moderations', dbAccessLayer.createModeration, dbAccessLayer.readModeration,
+                                      dbAccessLayer.updateModeration, dbAccessLayer.deleteModeration,
+                                      createMany=dbAccessLayer.createModerations,
+                                      forUser=dbAccessLayer.readUserModerations,
+                                      forUserAllServers=dbAccessLayer.readUserModerationsAllServers,
+                                      history=dbAccessLayer.readModerationHistory,
+                                      summary=dbAccessLayer.readModerationSummary)
+        self.suggestions = AsyncTable(self, 'Suggestions', dbAccessLayer.createSuggestion, dbAccessLayer.readSuggestion,
+                                      dbAccessLayer.updateSuggestion, dbAccessLayer.deleteSuggestion,
+                                      pending=dbAccessLayer.readPendingSuggestions,
+                                      byMessage=dbAccessLayer.readSuggestionByMessage)
+        self.starboards = AsyncTable(self, 'Starboards', dbAccessLayer.createStarboard, dbAccessLayer.readStarboard,
+                                     dbAccessLayer.updateStarboard, dbAccessLayer.deleteStarboard,
+                                     forServer=dbAccessLayer.readServerStarboards,
+                                     addPost=dbAccessLayer.createStarboardPost,
+                                     posts=dbAccessLayer.readStarboardPosts,
+                                     updatePostStars=dbAccessLayer.updateStarboardPostStars,
+                                     deletePost=dbAccessLayer.deleteStarboardPost)
+
+    async def run(self, func, *args, **kwargs):
+        # Run any blocking dbAccessLayer function on the DB thread
+        lock = self.transactionLock
+        if lock is not None and lock.locked() and not inTransaction.get():
+            # Wait for the open transaction so this statement doesn't land inside it
+            async with lock:
+                pass
+        return await self.submit(func, *args, **kwargs)
+
+    async def submit(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def getTransactionLock(self):
+        # Created lazily so the lock binds to the loop bot.run starts
+        if self.transactionLock is None:
+            self.transactionLock = asyncio.Lock()
+        return self.transactionLock
+
+    def transaction(self):
+        return AsyncTransaction(self)
+
+    def addShutdownHook(self, func):
+        # Blocking callables run after queued writes land and before the pool closes
+        self.shutdownHooks.append(func)
+
+    def shutdown(self):
+        # Waits for queued writes to finish before closing the pooled connections
+        self.executor.shutdown(wait=True)
+        for hook in self.shutdownHooks:
+            hook()
+        dbAccessLayer.closeDB()
+
+db = AsyncDatabase()
@@ -0,0 +1,237 @@
+import time
+from collections import OrderedDict
+
+# In-memory caches that keep hot-path lookups from reaching SQLite.
+
+KNOWN_USERS_SIZE = 100000
+SERVER_CONFIG_SIZE = 10000
+SERVER_CONFIG_TTL = 300.0
+STARBOARD_CONFIG_SIZE = 10000
+MUTE_ROLE_NAME = 'Muted'
+DEFAULT_PREFIX = '!'
+
+SERVER_COLUMNS = ('ServerID', 'Name', 'Icon', 'Prefix', 'Language', 'ModRole', 'AdminRole', 'MuteRole', 'LogChannel')
+ROLE_COLUMNS = ('ModRole', 'AdminRole', 'MuteRole')
+
+class KnownUserCache:
+    """Bounded LRU of UserIDs already persisted in the User table."""
+
+    def __init__(self, maxSize=KNOWN_USERS_SIZE):
+        self.maxSize = maxSize
+        self.userIDs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, userID):
+        if userID in self.userIDs:
+            self.userIDs.move_to_end(userID)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, userID):
+        self.userIDs[userID] = None
+        self.userIDs.move_to_end(userID)
+        if len(self.userIDs) > self.maxSize:
+            self.userIDs.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, userID):
+        self.userIDs.pop(userID, None)
+
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'size': len(self.userIDs),
+            'maxSize': self.maxSize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hitRate': self.hitRate(),
+        }
+
+class ServerConfigCache:
+    """Read-through cache of Server rows, keyed by ServerID.
+
+    Entries expire after ttl seconds and are dropped whenever the row is written through
+    db.servers. Guilds without a Server row are cached as None so they cost no query either.
+    """
+
+    def __init__(self, database, ttl=SERVER_CONFIG_TTL, maxSize=SERVER_CONFIG_SIZE):
+        self.database = database
+        self.ttl = ttl
+        self.maxSize = maxSize
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        database.servers.addWriteListener(self.invalidate)
+
+    async def get(self, serverID):
+        entry = self.entries.get(serverID)
+        if entry is not None and entry[0] > time.monotonic():
+            self.entries.move_to_end(serverID)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        generation = self.generation
+        row = await self.database.servers.get(serverID)
+        config = dict(zip(SERVER_COLUMNS, row)) if row else None
+        # Don't cache a row that was invalidated while we were reading it
+        if generation == self.generation:
+            self.entries[serverID] = (time.monotonic() + self.ttl, config)
+            self.entries.move_to_end(serverID)
+            if len(self.entries) > self.maxSize:
+                self.entries.popitem(last=False)
+        return config
+
+    async def prefix(self, serverID, default=DEFAULT_PREFIX):
+        config = await self.get(serverID)
+        return config['Prefix'] if config else default
+
+    def invalidate(self, serverID):
+        self.generation += 1
+        self.entries.pop(serverID, None)
+
+    def clear(self):
+        self.generation += 1
+        self.entries.clear()
+
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'size': len(self.entries),
+            'maxSize': self.maxSize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': self.hitRate(),
+        }
+
+class GuildResolver:
+    """Per-guild Role/Channel objects for the Server row's ModRole, AdminRole, MuteRole and LogChannel.
+
+    Built once from the cached Server row with guild.get_role/get_channel (dict lookups), then
+    reused until a role/channel event for that guild or a db.servers write drops it, or it expires
+    along with the Server row it was built from. Guilds without a Server row fall back to the role
+    named MUTE_ROLE_NAME and the given IDs.
+    """
+
+    def __init__(self, serverConfigs, database, fallbackLogChannelID=None, fallbackMuteRoleID=None):
+        self.serverConfigs = serverConfigs
+        # Same lifetime as the Server rows, so a missed event only leaves an object stale that long
+        self.ttl = serverConfigs.ttl
+        self.fallbackLogChannelID = fallbackLogChannelID
+        self.fallbackMuteRoleID = fallbackMuteRoleID
+        self.entries = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        database.servers.addWriteListener(self.invalidate)
+
+    async def get(self, guild):
+        entry = self.entries.get(guild.id)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        generation = self.generation
+        config = await self.serverConfigs.get(guild.id) or {}
+        entry = {column: guild.get_role(config[column]) if config.get(column) else None for column in ROLE_COLUMNS}
+        logChannelID = config.get('LogChannel') or self.fallbackLogChannelID
+        entry['LogChannel'] = guild.get_channel(logChannelID) if logChannelID else None
+        if entry['MuteRole'] is None:
+            entry['MuteRole'] = (self.fallbackMuteRoleID and guild.get_role(self.fallbackMuteRoleID)) or \
+                next((role for role in guild.roles if role.name == MUTE_ROLE_NAME), None)
+        if generation == self.generation:
+            self.entries[guild.id] = (time.monotonic() + self.ttl, entry)
+        return entry
+
+    async def muteRole(self, guild):
+        return (await self.get(guild))['MuteRole']
+
+    async def modRole(self, guild):
+        return (await self.get(guild))['ModRole']
+
+    async def adminRole(self, guild):
+        return (await self.get(guild))['AdminRole']
+
+    async def logChannel(self, guild):
+        return (await self.get(guild))['LogChannel']
+
+    def invalidate(self, guildID):
+        # Call from on_guild_role_* / on_guild_channel_* with the guild's ID
+        self.generation += 1
+        self.entries.pop(guildID, None)
+
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': self.hitRate(),
+        }
+
+class StarboardConfigCache:
+    """Read-through cache of each guild's Starboards rows, keyed by ServerID.
+
+    db.starboards writes are keyed by ServerID on create but StarID on update/delete, so any
+    write clears the whole cache; starboard settings change rarely compared to reactions.
+    """
+
+    def __init__(self, database, ttl=SERVER_CONFIG_TTL, maxSize=STARBOARD_CONFIG_SIZE):
+        self.database = database
+        self.ttl = ttl
+        self.maxSize = maxSize
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        database.starboards.addWriteListener(self.invalidate)
+
+    async def get(self, serverID):
+        entry = self.entries.get(serverID)
+        if entry is not None and entry[0] > time.monotonic():
+            self.entries.move_to_end(serverID)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        generation = self.generation
+        starboards = await self.database.starboards.forServer(serverID)
+        if generation == self.generation:
+            self.entries[serverID] = (time.monotonic() + self.ttl, starboards)
+            self.entries.move_to_end(serverID)
+            if len(self.entries) > self.maxSize:
+                self.entries.popitem(last=False)
+        return starboards
+
+    def invalidate(self, key=None):
+        self.generation += 1
+        self.entries.clear()
+
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'size': len(self.entries),
+            'maxSize': self.maxSize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': self.hitRate(),
+        }
@@ -0,0 +1,326 @@
+import os
+import sqlite3
+import logging
+import threading
+import queue
+import time
+import atexit
+from contextlib import contextmanager
+
+from .metrics import registry, DB_STATEMENT_ERRORS
+
+# Configure logging
+logging.basicConfig(filename='dbAccess.log', level=logging.ERROR,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Override per bot with configurePool(database=...) or the LaunchpadDatabase environment variable
+DATABASE = os.getenv('LaunchpadDatabase', 'launchpad.db')
+POOL_SIZE = 5
+POOL_TIMEOUT = 5.0
+HEALTH_CHECK_INTERVAL = 30.0
+STATEMENT_CACHE_SIZE = 256
+STORAGE_PROFILE = 'balanced'
+
+# PRAGMAs applied to every new connection. WAL lets readers run alongside the writer;
+# the profiles trade commit durability (synchronous) and memory for throughput.
+STORAGE_PROFILES = {
+    # SQLite's own defaults: rollback journal and a full fsync per commit
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+    },
+    # WAL, but still fsync on every commit
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -8000,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+    # WAL fsyncs only at checkpoints; a power cut can lose the last commits but never corrupts
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # No fsync at all; for benchmarks and data you can rebuild
+    'throughput': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+}
+
+def applyStorageProfile(conn, profile=STORAGE_PROFILE):
+    # profile is a STORAGE_PROFILES name or a dict of PRAGMA name -> value
+    pragmas = STORAGE_PROFILES[profile] if isinstance(profile, str) else profile
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}").fetchall()
+
+class TransactionError(sqlite3.Error):
+    pass
+
+class PooledCursor(sqlite3.Cursor):
+    # Flags the connection when a statement fails, so an enclosing transaction() rolls back
+    # even though the accessor that ran it only logs the error
+
+    def execute(self, sql, parameters=()):
+        try:
+            return super().execute(sql, parameters)
+        except sqlite3.Error:
+            if self.connection.transactionDepth:
+                self.connection.failed = True
+            DB_STATEMENT_ERRORS.labels().inc()
+            raise
+
+    def executemany(self, sql, parameters):
+        try:
+            return super().executemany(sql, parameters)
+        except sqlite3.Error:
+            if self.connection.transactionDepth:
+                self.connection.failed = True
+            DB_STATEMENT_ERRORS.labels().inc()
+            raise
+
+class PooledConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.transactionDepth = 0
+        self.failed = False
+        self.pool = None
+
+    def cursor(self, factory=PooledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, parameters):
+        return self.cursor().executemany(sql, parameters)
+
+    def commit(self):
+        # Inside transaction() only the outermost block commits
+        if self.transactionDepth == 0:
+            committed = self.in_transaction
+            super().commit()
+            if committed and self.pool is not None:
+                self.pool.stats['commits'] += 1
+
+class ConnectionPool:
+    """Keeps up to maxSize long-lived SQLite connections and hands them out to callers.
+
+    Connections are opened lazily with the storage profile applied, reused LIFO so the hottest
+    one keeps its page cache, and pinged with SELECT 1 before reuse when they have been idle for a while.
+    """
+
+    def __init__(self, database=DATABASE, maxSize=POOL_SIZE, timeout=POOL_TIMEOUT, healthCheckInterval=HEALTH_CHECK_INTERVAL,
+                 storageProfile=STORAGE_PROFILE):
+        self.database = database
+        self.storageProfile = storageProfile
+        self.maxSize = maxSize
+        self.timeout = timeout
+        self.healthCheckInterval = healthCheckInterval
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.created = 0
+        self.closed = False
+        self.stats = {'acquired': 0, 'opened': 0, 'discarded': 0, 'waits': 0, 'commits': 0}
+
+    def createConnection(self):
+        # The pool hands connections across threads, so sqlite3's same-thread guard is disabled
+        conn = sqlite3.connect(self.database, timeout=self.timeout, check_same_thread=False, factory=PooledConnection,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        try:
+            applyStorageProfile(conn, self.storageProfile)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        conn.pool = self
+        self.stats['opened'] += 1
+        return conn
+
+    def isHealthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Discarding unhealthy pooled connection: {str(e)}")
+            return False
+
+    def discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self.lock:
+            self.created -= 1
+            self.stats['discarded'] += 1
+
+    def acquire(self):
+        if self.closed:
+            raise sqlite3.ProgrammingError("Connection pool has been closed")
+        while True:
+            try:
+                conn, releasedAt = self.idle.get_nowait()
+            except queue.Empty:
+                with self.lock:
+                    canCreate = self.created < self.maxSize
+                    if canCreate:
+                        self.created += 1
+                if canCreate:
+                    try:
+                        conn = self.createConnection()
+                    except sqlite3.Error:
+                        with self.lock:
+                            self.created -= 1
+                        raise
+                    self.stats['acquired'] += 1
+                    return conn
+                self.stats['waits'] += 1
+                try:
+                    conn, releasedAt = self.idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError(f"Timed out after {self.timeout}s waiting for a pooled connection")
+            if time.monotonic() - releasedAt > self.healthCheckInterval and not self.isHealthy(conn):
+                self.discard(conn)
+                continue
+            self.stats['acquired'] += 1
+            return conn
+
+    def release(self, conn):
+        # A failure flagged outside transaction() must not roll back the next caller's
+        conn.failed = False
+        if self.closed:
+            self.discard(conn)
+            return
+        try:
+            # Never hand out a connection with someone else's half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self.discard(conn)
+            return
+        self.idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                conn, _ = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(conn)
+
+_pool = ConnectionPool()
+
+def configurePool(database=None, maxSize=None, timeout=None, healthCheckInterval=None, storageProfile=None):
+    # Replaces the shared pool; connections from the old one are closed
+    global _pool
+    old = _pool
+    _pool = ConnectionPool(
+        database if database is not None else old.database,
+        maxSize if maxSize is not None else old.maxSize,
+        timeout if timeout is not None else old.timeout,
+        healthCheckInterval if healthCheckInterval is not None else old.healthCheckInterval,
+        storageProfile if storageProfile is not None else old.storageProfile,
+    )
+    old.close()
+    return _pool
+
+def getPool():
+    return _pool
+
+# Read from whichever pool is current when the metrics are exported
+POOL_EVENTS = registry.counter('launchpad_pool_events_total', "Connection pool events (acquired, opened, discarded, waits, commits)", ('event',))
+for _event in _pool.stats:
+    POOL_EVENTS.labels(_event).setFunction(lambda event=_event: _pool.stats[event])
+POOL_CONNECTIONS = registry.gauge('launchpad_pool_connections', "Pooled connections by state", ('state',))
+POOL_CONNECTIONS.labels('open').setFunction(lambda: _pool.created)
+POOL_CONNECTIONS.labels('idle').setFunction(lambda: _pool.idle.qsize())
+
+# Connection of the transaction() open on this thread, if any
+_local = threading.local()
+
+def connectDB():
+    conn = getattr(_local, 'connection', None)
+    if conn is not None:
+        return conn
+    try:
+        return _pool.acquire()
+    except sqlite3.Error as e:
+        logging.error(f"Error connecting to the database: {str(e)}")
+        return None
+
+def releaseDB(conn):
+    # The transaction's connection goes back to the pool when the outermost block exits
+    if conn is getattr(_local, 'connection', None):
+        return
+    conn.pool.release(conn)
+
+@contextmanager
+def transaction():
+    """Unit of work: every accessor called inside shares one connection and one commit.
+
+    Nested blocks become savepoints. If a statement fails, even one whose accessor only logged the
+    error, the block rolls back and raises TransactionError.
+    """
+    conn = getattr(_local, 'connection', None)
+    if conn is None:
+        conn = _pool.acquire()
+        _local.connection = conn
+        conn.transactionDepth = 1
+        conn.failed = False
+        try:
+            conn.execute("BEGIN")
+            yield conn
+            if conn.failed:
+                raise TransactionError("A statement in the transaction failed; rolled back")
+            sqlite3.Connection.commit(conn)
+            conn.pool.stats['commits'] += 1
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.transactionDepth = 0
+            conn.failed = False
+            _local.connection = None
+            # Back to the pool it came from, even if configurePool has replaced the shared one since
+            conn.pool.release(conn)
+    else:
+        savepoint = f"sp{conn.transactionDepth}"
+        conn.transactionDepth += 1
+        outerFailed, conn.failed = conn.failed, False
+        try:
+            conn.execute(f"SAVEPOINT {savepoint}")
+            yield conn
+            if conn.failed:
+                raise TransactionError("A statement in the savepoint failed; rolled back")
+            conn.execute(f"RELEASE {savepoint}")
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+            raise
+        finally:
+            conn.transactionDepth -= 1
+            conn.failed = outerFailed
+
+def closeDB():
+    # Shutdown hook: closes every idle pooled connection
+    _pool.close()
+
+atexit.register(closeDB)
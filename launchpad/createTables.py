@@ -0,0 +1,24 @@
+import sqlite3
+from .connection import getPool, applyStorageProfile
+from .migrations import migrate
+
+def createDatabaseTables(database=None, storageProfile=None):
+    # Defaults to the database and storage profile the shared pool was configured with
+    pool = getPool()
+    database = database if database is not None else pool.database
+    storageProfile = storageProfile if storageProfile is not None else pool.storageProfile
+
+    # Create a new SQLite database
+    connection = sqlite3.connect(database)
+    
+    # Switch the file to the configured journal mode before any tables exist
+    applyStorageProfile(connection, storageProfile)
+    
+    # Apply any pending schema migrations (just a version check when already current)
+    migrate(connection)
+    
+    # Committing the changes
+    connection.commit()
+    
+    # Closing the connection
+    connection.close()
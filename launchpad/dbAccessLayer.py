@@ -0,0 +1,667 @@
+import sqlite3
+import logging
+from functools import partial
+
+from .connection import (DATABASE, POOL_SIZE, POOL_TIMEOUT, HEALTH_CHECK_INTERVAL, STATEMENT_CACHE_SIZE, STORAGE_PROFILE,
+                         STORAGE_PROFILES, applyStorageProfile, TransactionError, ConnectionPool, configurePool, getPool,
+                         connectDB, releaseDB, transaction, closeDB)
+from .repository import (TABLES, TableSpec, StatementRegistry, statements, updateStatement, BULK_CHUNK_SIZE, chunked,
+                         createRow, readRow, updateRow, deleteRow, createMany, readMany, updateMany, deleteMany)
+from .metrics import timeCall
+
+# Plain CRUD for every table comes from the repository engine; the functions further down are the
+# queries and multi-table writes that are specific to one table.
+
+createUser = partial(createRow, 'User')
+readUser = partial(readRow, 'User')
+updateUser = partial(updateRow, 'User')
+deleteUser = partial(deleteRow, 'User')
+
+createServer = partial(createRow, 'Server')
+readServer = partial(readRow, 'Server')
+updateServer = partial(updateRow, 'Server')
+deleteServer = partial(deleteRow, 'Server')
+
+createReminder = partial(createRow, 'Reminders')
+readReminder = partial(readRow, 'Reminders')
+updateReminder = partial(updateRow, 'Reminders')
+deleteReminder = partial(deleteRow, 'Reminders')
+
+# createModeration is defined below: it also maintains the Member summary and User counters
+readModeration = partial(readRow, 'Moderations')
+updateModeration = partial(updateRow, 'Moderations')
+deleteModeration = partial(deleteRow, 'Moderations')
+
+createSuggestion = partial(createRow, 'Suggestions')
+readSuggestion = partial(readRow, 'Suggestions')
+updateSuggestion = partial(updateRow, 'Suggestions')
+deleteSuggestion = partial(deleteRow, 'Suggestions')
+
+createStarboard = partial(createRow, 'Starboards')
+readStarboard = partial(readRow, 'Starboards')
+updateStarboard = partial(updateRow, 'Starboards')
+deleteStarboard = partial(deleteRow, 'Starboards')
+
+@timeCall('ensure', 'User')
+def ensureUser(userID, username, avatar, isBot, joinedAt):
+    # Upsert that leaves an existing row untouched, so no SELECT is needed first
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO User (UserID, Username, Avatar, IsBot, JoinedAt)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (UserID) DO NOTHING;
+            """, (userID, username, avatar, isBot, joinedAt))
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error ensuring user: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return False
+
+@timeCall('incrementMessages', 'User')
+def incrementUserMessages(userID):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE User SET TotalMessages = TotalMessages + 1 WHERE UserID = ?", (userID,))
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Error updating total messages count: {str(e)}")
+        finally:
+            releaseDB(conn)
+
+@timeCall('incrementReactions', 'User')
+def incrementUserReactions(userID):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE User SET TotalReactions = TotalReactions + 1 WHERE UserID = ?", (userID,))
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Error updating total reactions count: {str(e)}")
+        finally:
+            releaseDB(conn)
+
+@timeCall('incrementCounters', 'User')
+def incrementUserCounters(rows):
+    # rows: (messages, reactions, userID) tuples, applied in a single transaction
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                UPDATE User SET TotalMessages = TotalMessages + ?, TotalReactions = TotalReactions + ?
+                WHERE UserID = ?;
+            """, rows)
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error updating activity counters: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return False
+
+# Member: one row per (ServerID, UserID) holding that guild's counters. The User columns
+# above stay as the member's totals across every guild.
+
+@timeCall('ensure', 'Member')
+def ensureMember(serverID, userID, joinedAt=None):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO Member (ServerID, UserID, JoinedAt) VALUES (?, ?, ?)
+                ON CONFLICT (ServerID, UserID) DO NOTHING;
+            """, (serverID, userID, joinedAt))
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error ensuring member: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return False
+
+@timeCall('ensureMany', 'Member')
+def ensureMembers(rows):
+    # rows: (serverID, userID, joinedAt)
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            for chunk in chunked(list(rows), BULK_CHUNK_SIZE):
+                cursor.executemany("""
+                    INSERT INTO Member (ServerID, UserID, JoinedAt) VALUES (?, ?, ?)
+                    ON CONFLICT (ServerID, UserID) DO NOTHING;
+                """, chunk)
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error ensuring members: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return False
+
+@timeCall('read', 'Member')
+def readMember(serverID, userID):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM Member WHERE ServerID = ? AND UserID = ?", (serverID, userID))
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading member: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return None
+
+@timeCall('delete', 'Member')
+def deleteMember(serverID, userID):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM Member WHERE ServerID = ? AND UserID = ?", (serverID, userID))
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Error deleting member: {str(e)}")
+        finally:
+            releaseDB(conn)
+
+INCREMENT_MEMBER_COUNTERS_SQL = """
+    INSERT INTO Member (ServerID, UserID, TotalMessages, TotalReactions) VALUES (?, ?, ?, ?)
+    ON CONFLICT (ServerID, UserID) DO UPDATE SET
+        TotalMessages = TotalMessages + excluded.TotalMessages,
+        TotalReactions = TotalReactions + excluded.TotalReactions;
+"""
+
+@timeCall('incrementCounters', 'Member')
+def incrementMemberCounters(rows):
+    # rows: (serverID, userID, messages, reactions); creates Member rows on first sight
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(INCREMENT_MEMBER_COUNTERS_SQL, rows)
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error updating member counters: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return False
+
+# Read back after an increment so callers see the new totals; chunks stay under the bound-parameter limit
+MEMBER_TOTALS_CHUNK_SIZE = 400
+
+@timeCall('readTotals', 'Member')
+def readMemberTotals(keys):
+    # keys: (serverID, userID); returns [(serverID, userID, TotalMessages, TotalReactions)]
+    totals = []
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            for chunk in chunked(list(keys), MEMBER_TOTALS_CHUNK_SIZE):
+                values = ', '.join('(?, ?)' for _ in chunk)
+                cursor.execute(f"""
+                    SELECT ServerID, UserID, TotalMessages, TotalReactions FROM Member
+                    WHERE (ServerID, UserID) IN (VALUES {values});
+                """, [value for key in chunk for value in key])
+                totals.extend(cursor.fetchall())
+        except sqlite3.Error as e:
+            logging.error(f"Error reading member totals: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return totals
+
+@timeCall('incrementActivity', 'Member')
+def incrementActivityCounters(rows):
+    # rows: (serverID, userID, messages, reactions); serverID is None for DMs.
+    # Guild and global counters are committed together. Returns the touched Member rows'
+    # new (serverID, userID, TotalMessages, TotalReactions), or None if nothing was written.
+    userTotals = {}
+    memberRows = []
+    for serverID, userID, messages, reactions in rows:
+        totals = userTotals.setdefault(userID, [0, 0])
+        totals[0] += messages
+        totals[1] += reactions
+        if serverID is not None:
+            memberRows.append((serverID, userID, messages, reactions))
+    try:
+        with transaction():
+            incrementUserCounters([(messages, reactions, userID) for userID, (messages, reactions) in userTotals.items()])
+            if not memberRows:
+                return []
+            incrementMemberCounters(memberRows)
+            return readMemberTotals((serverID, userID) for serverID, userID, _, _ in memberRows)
+    except sqlite3.Error as e:
+        logging.error(f"Error updating activity counters: {str(e)}")
+    return None
+
+# "Top N in this guild", served by idx_Member_Messages / idx_Member_Reactions; the index
+# carries UserID after the counter (WITHOUT ROWID key), so the tiebreak needs no sort
+MEMBER_RANKINGS = {'messages': 'TotalMessages', 'reactions': 'TotalReactions'}
+
+TOP_MEMBERS_SQL = {
+    ranking: f"""
+    SELECT UserID, {column} FROM Member
+    WHERE ServerID = ?
+    ORDER BY {column} DESC, UserID DESC
+    LIMIT ?;
+"""
+    for ranking, column in MEMBER_RANKINGS.items()
+}
+
+@timeCall('readTop', 'Member')
+def readTopMembers(serverID, ranking='messages', limit=10):
+    # Returns [(userID, count)] for MEMBER_RANKINGS key ranking
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(TOP_MEMBERS_SQL[ranking], (serverID, limit))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading top members: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return []
+
+MODERATION_COUNTERS = {'WARN': 'Warns', 'KICK': 'Kicks', 'MUTE': 'Mutes'}
+
+@timeCall('incrementModerationCount', 'User')
+def incrementUserModerationCount(userID, action):
+    # Bumps Warns/Kicks/Mutes for the action; other actions have no counter
+    column = MODERATION_COUNTERS.get(action.upper())
+    if column is None:
+        return
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"UPDATE User SET {column} = {column} + 1 WHERE UserID = ?", (userID,))
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Error updating moderation count: {str(e)}")
+        finally:
+            releaseDB(conn)
+
+# Served by the partial index idx_Reminders_Due, which only holds unsent reminders
+DUE_REMINDERS_SQL = """
+    SELECT * FROM Reminders
+    WHERE Reminded = 0 AND RemindAt <= ?
+    ORDER BY RemindAt
+    LIMIT ?;
+"""
+
+@timeCall('readDue', 'Reminders')
+def readDueReminders(remindAt, limit=100):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(DUE_REMINDERS_SQL, (remindAt, limit))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading due reminders: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return []
+
+# Keyset page of unsent reminders after (RemindAt, ReminderID), also served by idx_Reminders_Due
+UPCOMING_REMINDERS_SQL = """
+    SELECT * FROM Reminders
+    WHERE Reminded = 0 AND (RemindAt, ReminderID) > (?, ?)
+    ORDER BY RemindAt, ReminderID
+    LIMIT ?;
+"""
+
+@timeCall('readUpcoming', 'Reminders')
+def readUpcomingReminders(afterRemindAt, afterReminderID, limit=1000):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(UPCOMING_REMINDERS_SQL, (afterRemindAt, afterReminderID, limit))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading upcoming reminders: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return []
+
+@timeCall('markDelivered', 'Reminders')
+def markRemindersDelivered(reminderIDs):
+    # One executemany and one commit for a whole batch of reminders
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.executemany("UPDATE Reminders SET Reminded = 1 WHERE ReminderID = ?",
+                               [(reminderID,) for reminderID in reminderIDs])
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error marking reminders delivered: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return False
+
+# Per-guild moderation totals on the Member row, kept in step with Moderations so !history never has to COUNT(*)
+SUMMARY_ACTIONS = ('WARN', 'KICK', 'MUTE', 'BAN')
+
+UPSERT_MODERATION_SUMMARY_SQL = """
+    INSERT INTO Member (ServerID, UserID, Warns, Kicks, Mutes, Bans, TotalModerations, LastModerationAt)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (ServerID, UserID) DO UPDATE SET
+        Warns = Warns + excluded.Warns,
+        Kicks = Kicks + excluded.Kicks,
+        Mutes = Mutes + excluded.Mutes,
+        Bans = Bans + excluded.Bans,
+        TotalModerations = TotalModerations + excluded.TotalModerations,
+        LastModerationAt = MAX(COALESCE(LastModerationAt, excluded.LastModerationAt), excluded.LastModerationAt);
+"""
+
+def moderationSummaryRow(serverID, userID, action, createdAt):
+    counts = [1 if action.upper() == summaryAction else 0 for summaryAction in SUMMARY_ACTIONS]
+    return (serverID, userID, *counts, 1, createdAt)
+
+@timeCall('create', 'Moderations')
+def createModeration(serverID, userID, action, reason, moderatorID, createdAt):
+    # The row, the guild summary and the User counter land in the same commit
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO Moderations (ServerID, UserID, Action, Reason, ModeratorID, CreatedAt)
+                VALUES (?, ?, ?, ?, ?, ?);
+            """, (serverID, userID, action, reason, moderatorID, createdAt))
+            moderationID = cursor.lastrowid
+            cursor.execute(UPSERT_MODERATION_SUMMARY_SQL, moderationSummaryRow(serverID, userID, action, createdAt))
+            column = MODERATION_COUNTERS.get(action.upper())
+            if column is not None:
+                cursor.execute(f"UPDATE User SET {column} = {column} + 1 WHERE UserID = ?", (userID,))
+            conn.commit()
+            return moderationID
+        except sqlite3.Error as e:
+            logging.error(f"Error creating moderation: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return None
+
+# Served by idx_Moderations_ServerUser; ModerationID (the rowid) breaks CreatedAt ties
+USER_MODERATIONS_SQL = """
+    SELECT * FROM Moderations
+    WHERE ServerID = ? AND UserID = ?
+    ORDER BY CreatedAt DESC, ModerationID DESC
+    LIMIT ?;
+"""
+
+# Keyset page: the rows older than (CreatedAt, ModerationID) of the previous page's last row
+MODERATION_HISTORY_SQL = """
+    SELECT * FROM Moderations
+    WHERE ServerID = ? AND UserID = ? AND (CreatedAt, ModerationID) < (?, ?)
+    ORDER BY CreatedAt DESC, ModerationID DESC
+    LIMIT ?;
+"""
+
+# Served by idx_Moderations_User
+USER_MODERATIONS_ALL_SERVERS_SQL = """
+    SELECT * FROM Moderations
+    WHERE UserID = ?
+    ORDER BY CreatedAt DESC
+    LIMIT ?;
+"""
+
+@timeCall('readForUser', 'Moderations')
+def readUserModerations(serverID, userID, limit=25):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(USER_MODERATIONS_SQL, (serverID, userID, limit))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading user moderations: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return []
+
+@timeCall('readHistory', 'Moderations')
+def readModerationHistory(serverID, userID, before=None, limit=10):
+    # before: (CreatedAt, ModerationID) of the last row already shown, None for the newest page
+    if before is None:
+        return readUserModerations(serverID, userID, limit)
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(MODERATION_HISTORY_SQL, (serverID, userID, before[0], before[1], limit))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading moderation history: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return []
+
+@timeCall('readModerationSummary', 'Member')
+def readModerationSummary(serverID, userID):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT ServerID, UserID, Warns, Kicks, Mutes, Bans, TotalModerations, LastModerationAt
+                FROM Member WHERE ServerID = ? AND UserID = ? AND TotalModerations > 0;
+            """, (serverID, userID))
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading moderation summary: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return None
+
+@timeCall('readForUserAllServers', 'Moderations')
+def readUserModerationsAllServers(userID, limit=25):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(USER_MODERATIONS_ALL_SERVERS_SQL, (userID, limit))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading user moderations: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return []
+
+# Served by the partial index idx_Suggestions_Pending
+PENDING_SUGGESTIONS_SQL = """
+    SELECT * FROM Suggestions
+    WHERE ServerID = ? AND Status = 'pending'
+    ORDER BY CreatedAt
+    LIMIT ?;
+"""
+
+@timeCall('readPending', 'Suggestions')
+def readPendingSuggestions(serverID, limit=25):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(PENDING_SUGGESTIONS_SQL, (serverID, limit))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading pending suggestions: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return []
+
+# Served by the partial index idx_Suggestions_Message
+SUGGESTION_BY_MESSAGE_SQL = "SELECT * FROM Suggestions WHERE MessageID = ?"
+
+@timeCall('readByMessage', 'Suggestions')
+def readSuggestionByMessage(messageID):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(SUGGESTION_BY_MESSAGE_SQL, (messageID,))
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading suggestion by message: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return None
+
+# Served by idx_Starboards_Server
+SERVER_STARBOARDS_SQL = "SELECT * FROM Starboards WHERE ServerID = ?"
+
+@timeCall('readForServer', 'Starboards')
+def readServerStarboards(serverID):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(SERVER_STARBOARDS_SQL, (serverID,))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading server starboards: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return []
+
+# StarboardPosts maps a starred message to the message reposting it on each starboard
+@timeCall('create', 'StarboardPosts')
+def createStarboardPost(messageID, starID, serverID, channelID, postID, stars):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO StarboardPosts (MessageID, StarID, ServerID, ChannelID, PostID, Stars)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (MessageID, StarID) DO UPDATE SET PostID = excluded.PostID, Stars = excluded.Stars;
+            """, (messageID, starID, serverID, channelID, postID, stars))
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error creating starboard post: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return False
+
+@timeCall('read', 'StarboardPosts')
+def readStarboardPosts(messageID):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM StarboardPosts WHERE MessageID = ?", (messageID,))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading starboard posts: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return []
+
+@timeCall('updateStars', 'StarboardPosts')
+def updateStarboardPostStars(rows):
+    # rows: (stars, messageID, starID)
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.executemany("UPDATE StarboardPosts SET Stars = ? WHERE MessageID = ? AND StarID = ?", rows)
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error updating starboard post stars: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return False
+
+@timeCall('delete', 'StarboardPosts')
+def deleteStarboardPost(messageID, starID):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM StarboardPosts WHERE MessageID = ? AND StarID = ?", (messageID, starID))
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Error deleting starboard post: {str(e)}")
+        finally:
+            releaseDB(conn)
+
+# Bulk variants; see repository.createMany for the row format
+
+createUsers = partial(createMany, 'User')
+# Rows for users that already exist are skipped, e.g. when backfilling a guild's members
+ensureUsers = partial(createMany, 'User', conflict='ON CONFLICT (UserID) DO NOTHING')
+readUsers = partial(readMany, 'User')
+updateUsers = partial(updateMany, 'User')
+deleteUsers = partial(deleteMany, 'User')
+
+createServers = partial(createMany, 'Server')
+readServers = partial(readMany, 'Server')
+updateServers = partial(updateMany, 'Server')
+deleteServers = partial(deleteMany, 'Server')
+
+createReminders = partial(createMany, 'Reminders')
+readReminders = partial(readMany, 'Reminders')
+updateReminders = partial(updateMany, 'Reminders')
+deleteReminders = partial(deleteMany, 'Reminders')
+
+@timeCall('createMany', 'Moderations')
+def createModerations(rows):
+    # Same bookkeeping as createModeration, with the summary and User deltas summed per member first
+    rows = list(rows)
+    summaries = {}
+    userCounters = {}
+    for serverID, userID, action, reason, moderatorID, createdAt in rows:
+        delta = moderationSummaryRow(serverID, userID, action, createdAt)
+        current = summaries.get((serverID, userID))
+        if current is None:
+            summaries[(serverID, userID)] = delta
+        else:
+            summaries[(serverID, userID)] = (serverID, userID, *(a + b for a, b in zip(current[2:7], delta[2:7])),
+                                             max(current[7], delta[7]))
+        column = MODERATION_COUNTERS.get(action.upper())
+        if column is not None:
+            userCounters[(column, userID)] = userCounters.get((column, userID), 0) + 1
+    try:
+        with transaction() as conn:
+            inserted = createMany('Moderations', rows)
+            conn.executemany(UPSERT_MODERATION_SUMMARY_SQL, list(summaries.values()))
+            for column in MODERATION_COUNTERS.values():
+                params = [(count, userID) for (counterColumn, userID), count in userCounters.items() if counterColumn == column]
+                if params:
+                    conn.executemany(f"UPDATE User SET {column} = {column} + ? WHERE UserID = ?", params)
+        return inserted
+    except sqlite3.Error as e:
+        logging.error(f"Error creating moderations: {str(e)}")
+    return None
+
+readModerations = partial(readMany, 'Moderations')
+updateModerations = partial(updateMany, 'Moderations')
+deleteModerations = partial(deleteMany, 'Moderations')
+
+createSuggestions = partial(createMany, 'Suggestions')
+readSuggestions = partial(readMany, 'Suggestions')
+updateSuggestions = partial(updateMany, 'Suggestions')
+deleteSuggestions = partial(deleteMany, 'Suggestions')
+
+createStarboards = partial(createMany, 'Starboards')
+readStarboards = partial(readMany, 'Starboards')
+updateStarboards = partial(updateMany, 'Starboards')
+deleteStarboards = partial(deleteMany, 'Starboards')
@@ -0,0 +1,102 @@
+import asyncio
+from .dbAccessLayer import MEMBER_RANKINGS
+
+# Per-guild top-N of the Member counters, answered from memory.
+# Each board is seeded once with readTopMembers and then fed the new totals of every Member row
+# an ActivityCounter flush touches. Counters only grow, so a member can only enter the top N by
+# passing the current last place, and every such change comes through a flush: the board stays
+# exact without re-querying.
+
+LEADERBOARD_SIZE = 25
+
+class TopMembers:
+    """The size best (count, userID) pairs of one guild and ranking, same order as readTopMembers."""
+
+    def __init__(self, size, rows):
+        self.size = size
+        self.counts = {userID: count for userID, count in rows}
+        self.ranked = None
+        self.floor = None
+        self.refresh()
+
+    def refresh(self):
+        self.ranked = sorted(self.counts.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        # Key a newcomer must beat once the board is full
+        self.floor = (self.ranked[-1][1], self.ranked[-1][0]) if len(self.ranked) >= self.size else None
+
+    def offer(self, userID, count):
+        if userID in self.counts:
+            if count <= self.counts[userID]:
+                return
+        elif self.floor is not None:
+            if (count, userID) <= self.floor:
+                return
+            del self.counts[self.floor[1]]
+        self.counts[userID] = count
+        self.refresh()
+
+class Leaderboard:
+    def __init__(self, database, activity, size=LEADERBOARD_SIZE):
+        self.database = database
+        self.size = size
+        # (serverID, ranking) -> TopMembers
+        self.boards = {}
+        # Totals that arrived while a board's seed query was in flight
+        self.seeding = {}
+        self.seedTasks = {}
+        self.stats = {'seeds': 0, 'reads': 0, 'offers': 0}
+        activity.addFlushListener(self.update)
+
+    async def top(self, serverID, ranking='messages', limit=10):
+        # [(userID, count)], best first
+        self.stats['reads'] += 1
+        board = self.boards.get((serverID, ranking))
+        if board is None:
+            board = await self.seed(serverID, ranking)
+        return board.ranked[:limit]
+
+    async def seed(self, serverID, ranking):
+        # Concurrent callers share one seed query per board
+        key = (serverID, ranking)
+        task = self.seedTasks.get(key)
+        if task is None:
+            task = self.seedTasks[key] = asyncio.ensure_future(self.load(key))
+        return await task
+
+    async def load(self, key):
+        serverID, ranking = key
+        self.seeding[key] = []
+        try:
+            rows = await self.database.members.top(serverID, ranking, self.size)
+            board = TopMembers(self.size, rows)
+            for userID, count in self.seeding[key]:
+                board.offer(userID, count)
+            self.boards[key] = board
+            self.stats['seeds'] += 1
+            return board
+        finally:
+            del self.seeding[key]
+            del self.seedTasks[key]
+
+    async def warm(self, serverIDs):
+        # Seed every guild up front, e.g. from on_ready
+        for serverID in serverIDs:
+            for ranking in MEMBER_RANKINGS:
+                if (serverID, ranking) not in self.boards:
+                    await self.seed(serverID, ranking)
+
+    def update(self, totals):
+        for serverID, userID, messages, reactions in totals:
+            for ranking, count in (('messages', messages), ('reactions', reactions)):
+                key = (serverID, ranking)
+                board = self.boards.get(key)
+                if board is not None:
+                    self.stats['offers'] += 1
+                    board.offer(userID, count)
+                elif key in self.seeding:
+                    self.seeding[key].append((userID, count))
+
+    def forget(self, serverID):
+        # e.g. on_guild_remove
+        for ranking in MEMBER_RANKINGS:
+            self.boards.pop((serverID, ranking), None)
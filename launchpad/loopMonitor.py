@@ -0,0 +1,201 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+import discord
+
+from .metrics import registry, handlerNames
+
+# Event loop lag and slow-callback monitor.
+# A watchdog thread posts a probe onto the loop every probeInterval with call_soon_threadsafe; how long
+# the probe waits to run is the loop's scheduling lag. A probe still waiting after threshold means a
+# callback is hogging the loop (typically a synchronous DB call inside a handler), so the watchdog
+# snapshots the loop thread's stack right then, while the offender is still on it, and attributes the
+# stall to the innermost event handler or command on that stack. It has to be a thread: anything
+# running on the loop only gets to look once the stall is already over.
+
+PROBE_INTERVAL = 0.025
+SLOW_CALLBACK_THRESHOLD = 0.05
+STACK_DEPTH = 20
+RECENT_STALLS = 20
+RECENT_LAGS = 2000
+
+# Lag buckets stop at 10s: past that the gateway heartbeat has long been missed
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LOOP_LAG_SECONDS = registry.histogram('launchpad_loop_lag_seconds', "Delay before a probe posted to the event loop ran",
+                                      buckets=LAG_BUCKETS)
+LOOP_STALLS = registry.counter('launchpad_loop_stalls_total', "Event loop stalls over the slow-callback threshold, by culprit",
+                               ('kind', 'name'))
+LOOP_STALL_SECONDS = registry.histogram('launchpad_loop_stall_seconds', "Duration of event loop stalls, by culprit",
+                                        ('kind', 'name'), buckets=LAG_BUCKETS)
+
+ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+# discord.py's own frames (dispatch, tasks.loop) say little about who stalled the loop
+DISCORD_DIR = os.path.dirname(discord.__file__)
+
+def codeName(code):
+    return getattr(code, 'co_qualname', code.co_name)
+
+def attribute(frame):
+    """(kind, name) for the stall whose innermost frame is frame.
+
+    The innermost registered event handler or command wins, so a slow command is blamed rather than
+    the on_message that dispatched it. Anything else (a tasks.loop flush, a bare callback) is named
+    after the outermost function the loop called into that isn't asyncio's or discord.py's.
+    """
+    entry = outermost = None
+    while frame is not None:
+        name = handlerNames.get(frame.f_code)
+        if name is not None:
+            return name
+        filename = frame.f_code.co_filename
+        if filename.startswith(ASYNCIO_DIR):
+            # Frames further out are asyncio's own and whatever started the loop
+            break
+        outermost = frame
+        if not filename.startswith(DISCORD_DIR):
+            entry = frame
+        frame = frame.f_back
+    entry = entry or outermost
+    if entry is None:
+        return ('callback', 'unknown')
+    return ('callback', codeName(entry.f_code))
+
+def callbackStack(frame, limit=STACK_DEPTH):
+    # The frames the loop called into, outermost first; asyncio's own frames and whatever started the loop are left off
+    frames = []
+    while frame is not None and len(frames) < limit and not frame.f_code.co_filename.startswith(ASYNCIO_DIR):
+        frames.append((frame, frame.f_lineno))
+        frame = frame.f_back
+    if not frames:
+        # A C callback or asyncio itself; its frames are all there is
+        return ''.join(traceback.format_stack(frame, limit=limit)) if frame is not None else ''
+    return ''.join(traceback.StackSummary.extract(reversed(frames)).format())
+
+class Probe:
+    # Posted onto the loop; its run time minus its post time is the loop's scheduling lag
+    def __init__(self):
+        self.done = threading.Event()
+        self.ranAt = None
+        self.postedAt = time.perf_counter()
+
+    def run(self):
+        self.ranAt = time.perf_counter()
+        self.done.set()
+
+    def lag(self):
+        return self.ranAt - self.postedAt
+
+class LoopMonitor:
+    def __init__(self, bot=None, threshold=SLOW_CALLBACK_THRESHOLD, probeInterval=PROBE_INTERVAL):
+        # bot: its commands are registered for attribution when the monitor starts
+        self.bot = bot
+        self.threshold = threshold
+        self.probeInterval = probeInterval
+        self.loop = None
+        self.loopThreadID = None
+        self.thread = None
+        self.stopping = threading.Event()
+        self.lags = deque(maxlen=RECENT_LAGS)
+        self.stalls = deque(maxlen=RECENT_STALLS)
+        # (kind, name) -> [stalls, total seconds, worst seconds]
+        self.culprits = {}
+        self.stats = {'probes': 0, 'stalls': 0, 'stalledSeconds': 0.0}
+
+    def start(self):
+        # Call from the loop (e.g. on_ready); safe to call again on every reconnect
+        if self.thread is not None and self.thread.is_alive():
+            return
+        if self.bot is not None:
+            for command in self.bot.walk_commands():
+                handlerNames[command.callback.__code__] = ('command', command.qualified_name)
+        self.loop = asyncio.get_running_loop()
+        self.loopThreadID = threading.get_ident()
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.watch, name='launchpad-loop-monitor', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+
+    def watch(self):
+        while not self.stopping.wait(self.probeInterval):
+            probe = Probe()
+            try:
+                self.loop.call_soon_threadsafe(probe.run)
+            except RuntimeError:
+                # The loop has been closed
+                return
+            if probe.done.wait(self.threshold):
+                self.recordLag(probe.lag())
+                continue
+            culprit, stack = self.capture()
+            while not probe.done.wait(self.probeInterval):
+                if self.stopping.is_set() or self.loop.is_closed():
+                    return
+            self.recordStall(probe.lag(), culprit, stack)
+
+    def capture(self):
+        frame = sys._current_frames().get(self.loopThreadID)
+        if frame is None:
+            return ('callback', 'unknown'), ''
+        return attribute(frame), callbackStack(frame)
+
+    def recordLag(self, lag):
+        self.stats['probes'] += 1
+        self.lags.append(lag)
+        LOOP_LAG_SECONDS.labels().observe(lag)
+
+    def recordStall(self, duration, culprit, stack):
+        # A lower bound: the stall may have begun up to probeInterval before the probe was posted
+        self.recordLag(duration)
+        self.stats['stalls'] += 1
+        self.stats['stalledSeconds'] += duration
+        entry = self.culprits.setdefault(culprit, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += duration
+        entry[2] = max(entry[2], duration)
+        self.stalls.append({'at': time.time(), 'seconds': duration, 'kind': culprit[0], 'name': culprit[1], 'stack': stack})
+        LOOP_STALLS.labels(*culprit).inc()
+        LOOP_STALL_SECONDS.labels(*culprit).observe(duration)
+        logging.error(f"Event loop stalled for {duration * 1000:.0f} ms in {culprit[0]} {culprit[1]}:\n{stack}")
+
+    def lagPercentile(self, fraction):
+        lags = sorted(self.lags)
+        if not lags:
+            return 0.0
+        return lags[min(len(lags) - 1, int(fraction * len(lags)))]
+
+    def worstCulprits(self, limit=5):
+        # By total time stalled: many medium stalls hurt as much as one long one
+        ranked = sorted(self.culprits.items(), key=lambda item: item[1][1], reverse=True)
+        return [(kind, name, count, total, worst) for (kind, name), (count, total, worst) in ranked[:limit]]
+
+    def report(self, maxLength=2000):
+        # Plain text for a chat command; the last stall's stack is trimmed from the outside in to fit maxLength
+        lines = [f"Loop lag over the last {len(self.lags)} probes: p50 {self.lagPercentile(0.50) * 1000:.1f} ms, "
+                 f"p99 {self.lagPercentile(0.99) * 1000:.1f} ms, max {max(self.lags, default=0.0) * 1000:.1f} ms",
+                 f"Stalls over {self.threshold * 1000:.0f} ms: {self.stats['stalls']} "
+                 f"({self.stats['stalledSeconds']:.2f}s stalled in total)"]
+        for kind, name, count, total, worst in self.worstCulprits():
+            lines.append(f"  {kind} {name}: {count} stalls, {total:.2f}s total, worst {worst * 1000:.0f} ms")
+        text = '\n'.join(lines)
+        if not self.stalls:
+            return text
+        last = self.stalls[-1]
+        text += (f"\nLast stall: {last['seconds'] * 1000:.0f} ms in {last['kind']} {last['name']}, "
+                 f"{time.time() - last['at']:.0f}s ago")
+        room = maxLength - len(text) - len("\n```\n```")
+        stack = last['stack']
+        if room <= 0 or not stack:
+            return text
+        if len(stack) > room:
+            stack = stack[len(stack) - room:]
+            # Start at a frame boundary rather than mid-line
+            stack = stack[stack.find('\n  File') + 1:] if '\n  File' in stack else ''
+        return f"{text}\n```\n{stack}```" if stack else text
@@ -0,0 +1,338 @@
+import os
+import time
+import random
+import logging
+import functools
+import threading
+from bisect import bisect_left
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# In-process metrics: counters, gauges and fixed-bucket histograms with labels, rendered in the
+# Prometheus text exposition format. Label children are created once and cached, so a hot-path
+# update is a dict lookup (or none, when the child is bound up front) plus a locked add.
+
+# Seconds; covers a cached lookup (sub-millisecond) up to a stalled commit or Discord round-trip
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+EXPORT_INTERVAL = 15.0
+
+def formatLabels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def formatValue(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0
+        self.function = None
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def setFunction(self, function):
+        # Read at export time instead, for totals something else already keeps (e.g. pool stats)
+        self.function = function
+
+    def get(self):
+        return self.function() if self.function is not None else self.value
+
+class GaugeChild(CounterChild):
+    def dec(self, amount=1):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+class HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        # counts are per bucket here and made cumulative when rendered
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+class Metric:
+    kind = None
+    childClass = None
+
+    def __init__(self, name, documentation, labelNames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelNames = tuple(labelNames)
+        self.children = {}
+        self.lock = threading.Lock()
+        if not self.labelNames:
+            # An unlabelled metric is exported (as 0) from the start
+            self.labels()
+
+    def newChild(self):
+        return self.childClass()
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelNames):
+                raise ValueError(f"{self.name} takes labels {self.labelNames}, got {values}")
+            with self.lock:
+                child = self.children.setdefault(values, self.newChild())
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self.children.items()):
+            lines.extend(self.renderChild(values, child))
+        return lines
+
+    def renderChild(self, values, child):
+        try:
+            value = child.get()
+        except Exception as e:
+            logging.error(f"Error reading metric {self.name}: {str(e)}")
+            return []
+        return [f"{self.name}{formatLabels(self.labelNames, values)} {formatValue(value)}"]
+
+class Counter(Metric):
+    kind = 'counter'
+    childClass = CounterChild
+
+class Gauge(Metric):
+    kind = 'gauge'
+    childClass = GaugeChild
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelNames=(), buckets=DEFAULT_BUCKETS):
+        # Set first: an unlabelled histogram creates its child in Metric.__init__
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelNames)
+
+    def newChild(self):
+        return HistogramChild(self.buckets)
+
+    def renderChild(self, values, child):
+        with child.lock:
+            counts = list(child.counts)
+            total = child.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            labels = formatLabels(self.labelNames, values, [('le', formatValue(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = formatLabels(self.labelNames, values)
+        lines.append(f"{self.name}_sum{labels} {formatValue(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Holds every metric and renders them for export.
+
+    sampleRate (0-1) is the share of calls the timing helpers measure; counters always count every
+    call. enabled=False turns the helpers into a plain call.
+    """
+
+    def __init__(self, sampleRate=1.0, enabled=True):
+        self.metrics = {}
+        self.sampleRate = sampleRate
+        self.enabled = enabled
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelNames != metric.labelNames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelNames=()):
+        return self.register(Counter(name, documentation, labelNames))
+
+    def gauge(self, name, documentation, labelNames=()):
+        return self.register(Gauge(name, documentation, labelNames))
+
+    def histogram(self, name, documentation, labelNames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelNames, buckets))
+
+    def sampled(self):
+        rate = self.sampleRate
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+    def render(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry(sampleRate=float(os.getenv('LaunchpadMetricsSampleRate') or 1.0))
+
+# Launchpad's own metrics
+
+DB_CALLS = registry.counter('launchpad_db_calls_total', "dbAccessLayer calls", ('table', 'operation'))
+DB_CALL_SECONDS = registry.histogram('launchpad_db_call_seconds', "dbAccessLayer call duration, including waiting for a pooled connection",
+                                     ('table', 'operation'))
+DB_STATEMENT_ERRORS = registry.counter('launchpad_db_statement_errors_total', "SQL statements that raised sqlite3.Error")
+HANDLER_CALLS = registry.counter('launchpad_handler_calls_total', "Discord event handler and command invocations", ('kind', 'name'))
+HANDLER_ERRORS = registry.counter('launchpad_handler_errors_total', "Event handlers and commands that raised", ('kind', 'name'))
+HANDLER_SECONDS = registry.histogram('launchpad_handler_seconds', "Event handler and command duration", ('kind', 'name'))
+
+# Code object of each instrumented handler -> (kind, name), so loopMonitor can tell whose frame is on a stalled stack
+handlerNames = {}
+
+def timeCall(operation, table=None):
+    """Decorator counting and timing a blocking DB function under (table, operation).
+
+    Without a table the function's first argument is the table name, as in the repository engine.
+    """
+    def decorator(func):
+        bound = (DB_CALLS.labels(table, operation), DB_CALL_SECONDS.labels(table, operation)) if table else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            calls, seconds = bound or (DB_CALLS.labels(args[0], operation), DB_CALL_SECONDS.labels(args[0], operation))
+            calls.inc()
+            if not registry.sampled():
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def timeEvent(func):
+    """Decorator for @bot.event handlers: counts, times and counts failures under the handler's name."""
+    name = func.__name__
+    handlerNames[func.__code__] = ('event', name)
+    calls = HANDLER_CALLS.labels('event', name)
+    errors = HANDLER_ERRORS.labels('event', name)
+    seconds = HANDLER_SECONDS.labels('event', name)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if not registry.enabled:
+            return await func(*args, **kwargs)
+        calls.inc()
+        start = time.perf_counter() if registry.sampled() else None
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            if start is not None:
+                seconds.observe(time.perf_counter() - start)
+    return wrapper
+
+def instrumentCommands(bot):
+    """Times every command through the bot's global before/after invoke hooks."""
+
+    async def beforeInvoke(ctx):
+        ctx.metricsStart = time.perf_counter() if registry.enabled and registry.sampled() else None
+
+    async def afterInvoke(ctx):
+        if not registry.enabled:
+            return
+        name = ctx.command.qualified_name if ctx.command else 'unknown'
+        HANDLER_CALLS.labels('command', name).inc()
+        if ctx.command_failed:
+            HANDLER_ERRORS.labels('command', name).inc()
+        start = getattr(ctx, 'metricsStart', None)
+        if start is not None:
+            HANDLER_SECONDS.labels('command', name).observe(time.perf_counter() - start)
+
+    bot.before_invoke(beforeInvoke)
+    bot.after_invoke(afterInvoke)
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = registry
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes would otherwise print a line to stderr every interval
+        pass
+
+class MetricsExporter:
+    """Exports the registry as Prometheus text to a file (rewritten every interval) and/or over HTTP.
+
+    Both run on daemon threads so rendering never blocks the event loop. The file is replaced
+    atomically, which is what node_exporter's textfile collector expects.
+    """
+
+    def __init__(self, path=None, port=None, host='127.0.0.1', interval=EXPORT_INTERVAL, registry=registry):
+        self.path = path
+        self.port = port
+        self.host = host
+        self.interval = interval
+        self.registry = registry
+        self.server = None
+        self.stopping = threading.Event()
+        self.writer = None
+
+    @classmethod
+    def fromEnvironment(cls):
+        # LaunchpadMetricsFile / LaunchpadMetricsPort; neither set means no export
+        return cls(path=os.getenv('LaunchpadMetricsFile') or None, port=int(os.getenv('LaunchpadMetricsPort') or 0) or None)
+
+    def start(self):
+        if self.path:
+            self.writer = threading.Thread(target=self.writeLoop, name='launchpad-metrics-file', daemon=True)
+            self.writer.start()
+        if self.port:
+            handler = type('RegistryHandler', (MetricsHandler,), {'registry': self.registry})
+            self.server = ThreadingHTTPServer((self.host, self.port), handler)
+            threading.Thread(target=self.server.serve_forever, name='launchpad-metrics-http', daemon=True).start()
+
+    def writeFile(self):
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, 'w') as output:
+                output.write(self.registry.render())
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logging.error(f"Error writing metrics file: {str(e)}")
+
+    def writeLoop(self):
+        while not self.stopping.wait(self.interval):
+            self.writeFile()
+
+    def stop(self):
+        # Shutdown hook: one last file write so the final counts are kept
+        self.stopping.set()
+        if self.path:
+            self.writeFile()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,335 @@
+import sqlite3
+import logging
+
+# Versioned schema migrations.
+# The schema version lives in PRAGMA user_version. Pending migrations are applied in order inside a
+# single transaction, so a database is either fully migrated or untouched, and starting up against a
+# current database costs one PRAGMA read.
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_Moderations_ServerUser ON Moderations (ServerID, UserID, CreatedAt)",
+    "CREATE INDEX IF NOT EXISTS idx_Moderations_User ON Moderations (UserID, CreatedAt)",
+    # Partial indexes only hold the rows still waiting on the bot
+    "CREATE INDEX IF NOT EXISTS idx_Reminders_Due ON Reminders (RemindAt) WHERE Reminded = 0",
+    "CREATE INDEX IF NOT EXISTS idx_Suggestions_Pending ON Suggestions (ServerID, CreatedAt) WHERE Status = 'pending'",
+    "CREATE INDEX IF NOT EXISTS idx_Starboards_Server ON Starboards (ServerID)",
+]
+
+# Version 1 is the schema createTables.py used to create, so existing databases adopt it as-is
+BASE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS User (
+        UserID BIGINT PRIMARY KEY,
+        Username VARCHAR(32) NOT NULL,
+        Avatar VARCHAR(64),
+        IsBot BOOLEAN DEFAULT FALSE NOT NULL,
+        JoinedAt TIMESTAMP NOT NULL,
+        Warns INT DEFAULT 0 NOT NULL,
+        Kicks INT DEFAULT 0 NOT NULL,
+        Mutes INT DEFAULT 0 NOT NULL,
+        TotalMessages INT DEFAULT 0 NOT NULL,
+        TotalReactions INT DEFAULT 0 NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Server (
+        ServerID BIGINT PRIMARY KEY,
+        Name VARCHAR(100) NOT NULL,
+        Icon VARCHAR(64),
+        Prefix VARCHAR(5) DEFAULT '!' NOT NULL,
+        Language VARCHAR(5) DEFAULT 'en' NOT NULL,
+        ModRole BIGINT NOT NULL,
+        AdminRole BIGINT NOT NULL,
+        MuteRole BIGINT NOT NULL,
+        LogChannel BIGINT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Reminders (
+        ReminderID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ServerID BIGINT NOT NULL REFERENCES Server(ServerID),
+        UserID BIGINT NOT NULL REFERENCES User(UserID),
+        ReminderText TEXT NOT NULL,
+        RemindAt TIMESTAMP NOT NULL,
+        Reminded BOOLEAN DEFAULT FALSE NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Moderations (
+        ModerationID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ServerID BIGINT NOT NULL REFERENCES Server(ServerID),
+        UserID VARCHAR(64) NOT NULL REFERENCES User(UserID),
+        Action VARCHAR(10) NOT NULL, -- WARN, KICK, MUTE
+        Reason TEXT,
+        ModeratorID BIGINT NOT NULL REFERENCES User(UserID),
+        CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Suggestions (
+        SuggestionID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ServerID BIGINT NOT NULL REFERENCES Server(ServerID),
+        UserID VARCHAR(64) NOT NULL REFERENCES User(UserID),
+        Suggestion TEXT NOT NULL,
+        MessageID BIGINT,
+        CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        Status VARCHAR(10) DEFAULT 'pending' NOT NULL,
+        ResolvedBy BIGINT,
+        ResolvedAt TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Starboards (
+        StarID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ServerID BIGINT NOT NULL REFERENCES Server(ServerID),
+        ChannelID BIGINT NOT NULL,
+        MinStars INT DEFAULT 3 NOT NULL
+    )
+    """,
+]
+
+# Version 3 tables: every Discord ID is INTEGER, and User/Server keys become rowid aliases
+INTEGER_ID_TABLES = [
+    ("User", """
+    CREATE TABLE User_new (
+        UserID INTEGER PRIMARY KEY,
+        Username VARCHAR(32) NOT NULL,
+        Avatar VARCHAR(64),
+        IsBot BOOLEAN DEFAULT FALSE NOT NULL,
+        JoinedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        Warns INT DEFAULT 0 NOT NULL,
+        Kicks INT DEFAULT 0 NOT NULL,
+        Mutes INT DEFAULT 0 NOT NULL,
+        TotalMessages INT DEFAULT 0 NOT NULL,
+        TotalReactions INT DEFAULT 0 NOT NULL
+    )
+    """, ("UserID",)),
+    ("Server", """
+    CREATE TABLE Server_new (
+        ServerID INTEGER PRIMARY KEY,
+        Name VARCHAR(100) NOT NULL,
+        Icon VARCHAR(64),
+        Prefix VARCHAR(5) DEFAULT '!' NOT NULL,
+        Language VARCHAR(5) DEFAULT 'en' NOT NULL,
+        ModRole INTEGER NOT NULL,
+        AdminRole INTEGER NOT NULL,
+        MuteRole INTEGER NOT NULL,
+        LogChannel INTEGER NOT NULL
+    )
+    """, ("ServerID", "ModRole", "AdminRole", "MuteRole", "LogChannel")),
+    ("Reminders", """
+    CREATE TABLE Reminders_new (
+        ReminderID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ServerID INTEGER NOT NULL REFERENCES Server(ServerID),
+        UserID INTEGER NOT NULL REFERENCES User(UserID),
+        ReminderText TEXT NOT NULL,
+        RemindAt TIMESTAMP NOT NULL,
+        Reminded BOOLEAN DEFAULT FALSE NOT NULL
+    )
+    """, ("ServerID", "UserID")),
+    ("Moderations", """
+    CREATE TABLE Moderations_new (
+        ModerationID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ServerID INTEGER NOT NULL REFERENCES Server(ServerID),
+        UserID INTEGER NOT NULL REFERENCES User(UserID),
+        Action VARCHAR(10) NOT NULL, -- WARN, KICK, MUTE
+        Reason TEXT,
+        ModeratorID INTEGER NOT NULL REFERENCES User(UserID),
+        CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+    )
+    """, ("ServerID", "UserID", "ModeratorID")),
+    ("Suggestions", """
+    CREATE TABLE Suggestions_new (
+        SuggestionID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ServerID INTEGER NOT NULL REFERENCES Server(ServerID),
+        UserID INTEGER NOT NULL REFERENCES User(UserID),
+        Suggestion TEXT NOT NULL,
+        MessageID INTEGER,
+        CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        Status VARCHAR(10) DEFAULT 'pending' NOT NULL,
+        ResolvedBy INTEGER,
+        ResolvedAt TIMESTAMP
+    )
+    """, ("ServerID", "UserID", "MessageID", "ResolvedBy")),
+    ("Starboards", """
+    CREATE TABLE Starboards_new (
+        StarID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ServerID INTEGER NOT NULL REFERENCES Server(ServerID),
+        ChannelID INTEGER NOT NULL,
+        MinStars INT DEFAULT 3 NOT NULL
+    )
+    """, ("ServerID", "ChannelID")),
+]
+
+def rebuildTable(conn, table, createSQL, integerColumns):
+    # SQLite can't change a column's type in place: copy into a new table, casting the ID columns
+    conn.execute(createSQL)
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    selectList = ', '.join(f"CAST({c} AS INTEGER)" if c in integerColumns else c for c in columns)
+    conn.execute(f"INSERT INTO {table}_new ({', '.join(columns)}) SELECT {selectList} FROM {table}")
+
+    # Keep AUTOINCREMENT counters so deleted IDs are never handed out again
+    sequence = None
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'").fetchone():
+        sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    if sequence:
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sequence[0], table))
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) SELECT ?, ? WHERE changes() = 0", (table, sequence[0]))
+
+def retypeIdColumns(conn):
+    for table, createSQL, integerColumns in INTEGER_ID_TABLES:
+        rebuildTable(conn, table, createSQL, integerColumns)
+    # Dropping the old tables dropped their indexes too
+    for statement in INDEXES:
+        conn.execute(statement)
+
+# Version 4: one row per starred message and starboard, so a restart edits the existing repost
+STARBOARD_POSTS = [
+    """
+    CREATE TABLE IF NOT EXISTS StarboardPosts (
+        MessageID INTEGER NOT NULL,
+        StarID INTEGER NOT NULL REFERENCES Starboards(StarID),
+        ServerID INTEGER NOT NULL REFERENCES Server(ServerID),
+        ChannelID INTEGER NOT NULL,
+        PostID INTEGER NOT NULL,
+        Stars INT DEFAULT 0 NOT NULL,
+        PRIMARY KEY (MessageID, StarID)
+    ) WITHOUT ROWID
+    """,
+]
+
+# Version 5: vote tallies written back by the suggestion workflow, and the reaction -> suggestion lookup
+SUGGESTION_VOTES = [
+    "ALTER TABLE Suggestions ADD COLUMN Upvotes INT DEFAULT 0 NOT NULL",
+    "ALTER TABLE Suggestions ADD COLUMN Downvotes INT DEFAULT 0 NOT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_Suggestions_Message ON Suggestions (MessageID) WHERE MessageID IS NOT NULL",
+]
+
+# Version 6: per-guild moderation totals, backfilled from the existing Moderations rows
+MODERATION_SUMMARY = [
+    """
+    CREATE TABLE IF NOT EXISTS ModerationSummary (
+        ServerID INTEGER NOT NULL,
+        UserID INTEGER NOT NULL,
+        Warns INT DEFAULT 0 NOT NULL,
+        Kicks INT DEFAULT 0 NOT NULL,
+        Mutes INT DEFAULT 0 NOT NULL,
+        Bans INT DEFAULT 0 NOT NULL,
+        Total INT DEFAULT 0 NOT NULL,
+        LastActionAt TIMESTAMP,
+        PRIMARY KEY (ServerID, UserID)
+    ) WITHOUT ROWID
+    """,
+    """
+    INSERT INTO ModerationSummary (ServerID, UserID, Warns, Kicks, Mutes, Bans, Total, LastActionAt)
+    SELECT ServerID, UserID,
+           SUM(UPPER(Action) = 'WARN'), SUM(UPPER(Action) = 'KICK'), SUM(UPPER(Action) = 'MUTE'), SUM(UPPER(Action) = 'BAN'),
+           COUNT(*), MAX(CreatedAt)
+    FROM Moderations
+    GROUP BY ServerID, UserID
+    """,
+]
+
+# Version 7: Member holds each guild's counters for a user. ModerationSummary folds into it.
+# The old activity counters have no guild, so they only seed Member on a single-guild database.
+MEMBER_TABLE = """
+    CREATE TABLE IF NOT EXISTS Member (
+        ServerID INTEGER NOT NULL,
+        UserID INTEGER NOT NULL,
+        JoinedAt TIMESTAMP,
+        TotalMessages INT DEFAULT 0 NOT NULL,
+        TotalReactions INT DEFAULT 0 NOT NULL,
+        Warns INT DEFAULT 0 NOT NULL,
+        Kicks INT DEFAULT 0 NOT NULL,
+        Mutes INT DEFAULT 0 NOT NULL,
+        Bans INT DEFAULT 0 NOT NULL,
+        TotalModerations INT DEFAULT 0 NOT NULL,
+        LastModerationAt TIMESTAMP,
+        PRIMARY KEY (ServerID, UserID)
+    ) WITHOUT ROWID
+"""
+
+def seedMemberActivity(conn):
+    if conn.execute("SELECT COUNT(*) FROM Server").fetchone()[0] != 1:
+        return
+    conn.execute("""
+        INSERT INTO Member (ServerID, UserID, JoinedAt, TotalMessages, TotalReactions)
+        SELECT Server.ServerID, User.UserID, User.JoinedAt, User.TotalMessages, User.TotalReactions
+        FROM User, Server WHERE true
+        ON CONFLICT (ServerID, UserID) DO UPDATE SET
+            JoinedAt = excluded.JoinedAt,
+            TotalMessages = excluded.TotalMessages,
+            TotalReactions = excluded.TotalReactions
+    """)
+
+MEMBERS = [
+    MEMBER_TABLE,
+    """
+    INSERT INTO Member (ServerID, UserID, Warns, Kicks, Mutes, Bans, TotalModerations, LastModerationAt)
+    SELECT ServerID, UserID, Warns, Kicks, Mutes, Bans, Total, LastActionAt FROM ModerationSummary
+    """,
+    seedMemberActivity,
+    "DROP TABLE ModerationSummary",
+    "CREATE INDEX IF NOT EXISTS idx_Member_Messages ON Member (ServerID, TotalMessages)",
+    "CREATE INDEX IF NOT EXISTS idx_Member_Reactions ON Member (ServerID, TotalReactions)",
+]
+
+# Version 8: the reminder scheduler keys on unix seconds. Legacy TIMESTAMP text such as '2023-01-02 00:00:00'
+# is read as UTC and converted; text SQLite can't parse is left alone and skipped by the scheduler.
+REMINDER_UNIX_TIMES = [
+    """
+    UPDATE Reminders SET RemindAt = CAST(strftime('%s', RemindAt) AS INTEGER)
+    WHERE typeof(RemindAt) = 'text' AND strftime('%s', RemindAt) IS NOT NULL
+    """,
+]
+
+# (version, description, steps); a step is a SQL statement or a function taking the connection
+MIGRATIONS = [
+    (1, "Base schema", BASE_SCHEMA),
+    (2, "Secondary indexes", INDEXES),
+    (3, "INTEGER Discord IDs", [retypeIdColumns]),
+    (4, "Starboard posts", STARBOARD_POSTS),
+    (5, "Suggestion votes", SUGGESTION_VOTES),
+    (6, "Moderation summaries", MODERATION_SUMMARY),
+    (7, "Per-guild Member counters", MEMBERS),
+    (8, "Unix-second reminder times", REMINDER_UNIX_TIMES),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def schemaVersion(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn):
+    version = schemaVersion(conn)
+    if version >= LATEST_VERSION:
+        return version
+
+    isolationLevel = conn.isolation_level
+    # Manage the transaction ourselves so DDL and the version bump commit together
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        # Another process may have migrated while we waited for the write lock
+        version = schemaVersion(conn)
+        for migrationVersion, description, steps in MIGRATIONS:
+            if migrationVersion <= version:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            version = migrationVersion
+        conn.execute(f"PRAGMA user_version = {version}")
+        conn.execute("COMMIT")
+    except sqlite3.Error as e:
+        conn.execute("ROLLBACK")
+        logging.error(f"Error migrating database schema: {str(e)}")
+        raise
+    finally:
+        conn.isolation_level = isolationLevel
+    return version
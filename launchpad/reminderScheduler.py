@@ -0,0 +1,193 @@
+import asyncio
+import heapq
+import logging
+import time
+
+# Delivers rows from the Reminders table at their RemindAt (unix seconds).
+# Unsent reminders are held in a min-heap keyed by (RemindAt, ReminderID) and the task sleeps
+# until the head is due. Only the earliest pageSize reminders are in memory: the rest stay in
+# SQLite and are paged in with a keyset query once the heap runs dry. Rows that never went through
+# schedule() (written by another process, or by db.reminders.create alone) are picked up by re-reading
+# the first page every REFRESH_INTERVAL.
+#
+# Due reminders are claimed (Reminded = 1, one batched UPDATE) before they are sent, so a restart
+# never sends a reminder twice; a crash between the claim and the send drops that batch instead.
+
+PAGE_SIZE = 1000
+MAX_BATCH = 100
+# Re-check at least this often, so a wall clock change can't leave a reminder waiting for hours
+MAX_SLEEP = 300.0
+RETRY_DELAY = 5.0
+REFRESH_INTERVAL = 300.0
+
+REMINDER_ID = 0
+REMIND_AT = 4
+
+class ReminderScheduler:
+    def __init__(self, database, deliver, pageSize=PAGE_SIZE, maxBatch=MAX_BATCH):
+        # deliver(reminder) is awaited with each due Reminders row
+        self.database = database
+        self.deliver = deliver
+        self.pageSize = pageSize
+        self.maxBatch = maxBatch
+        self.heap = []
+        # ReminderIDs in the heap, so a row that is both paged in and scheduled is queued once
+        self.queued = set()
+        # Every unsent reminder up to this key is in the heap; later ones are only in the database
+        self.horizon = (float('-inf'), 0)
+        self.exhausted = False
+        self.refreshedAt = time.monotonic()
+        self.loading = False
+        self.deferred = []
+        self.wake = None
+        self.task = None
+        # ReminderIDs whose RemindAt isn't a number (legacy text the v8 migration couldn't parse)
+        self.skipped = set()
+        self.stats = {'loaded': 0, 'pages': 0, 'delivered': 0, 'failed': 0, 'claimFailures': 0, 'skipped': 0}
+
+    def start(self):
+        # Safe to call from every on_ready; reconnects don't start a second task
+        if self.task is None or self.task.done():
+            self.wake = asyncio.Event()
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    def schedule(self, reminder):
+        # Call after the row is written; reminders past the horizon are paged in later
+        if self.loading:
+            # The page being read may or may not include this row; decide once it lands
+            self.deferred.append(reminder)
+            return
+        if not self.isSchedulable(reminder):
+            return
+        if not self.exhausted and self.beyondHorizon((reminder[REMIND_AT], reminder[REMINDER_ID])):
+            return
+        if not self.push(reminder):
+            return
+        if self.heap[0][2] is reminder and self.wake is not None:
+            # New head of the queue: recompute how long to sleep
+            self.wake.set()
+
+    def isSchedulable(self, reminder):
+        # Text would break both the heap ordering and the sleep arithmetic; such rows are logged once and left
+        # in the table, and paging moves past them, so they are never retried
+        if isinstance(reminder[REMIND_AT], (int, float)):
+            return True
+        if reminder[REMINDER_ID] not in self.skipped:
+            self.skipped.add(reminder[REMINDER_ID])
+            self.stats['skipped'] += 1
+            logging.error(f"Skipping reminder {reminder[REMINDER_ID]}: RemindAt {reminder[REMIND_AT]!r} is not unix seconds")
+        return False
+
+    def beyondHorizon(self, key):
+        # SQLite sorts text after every number, so a horizon that reached skipped text rows covers every real time
+        if not isinstance(self.horizon[0], (int, float)):
+            return False
+        return key > self.horizon
+
+    def push(self, reminder):
+        if not self.isSchedulable(reminder):
+            return False
+        if reminder[REMINDER_ID] in self.queued:
+            return False
+        self.queued.add(reminder[REMINDER_ID])
+        heapq.heappush(self.heap, (reminder[REMIND_AT], reminder[REMINDER_ID], reminder))
+        if len(self.heap) > 2 * self.pageSize:
+            self.shrink()
+        return True
+
+    def shrink(self):
+        # Keep the earliest pageSize reminders and let the rest come back from the database
+        self.heap = heapq.nsmallest(self.pageSize, self.heap)
+        heapq.heapify(self.heap)
+        self.queued = {entry[1] for entry in self.heap}
+        last = max(self.heap)
+        self.horizon = (last[0], last[1])
+        self.exhausted = False
+
+    async def loadPage(self):
+        self.loading = True
+        try:
+            rows = await self.database.reminders.upcoming(self.horizon[0], self.horizon[1], self.pageSize)
+        finally:
+            self.loading = False
+        if rows:
+            self.horizon = (rows[-1][REMIND_AT], rows[-1][REMINDER_ID])
+        self.exhausted = len(rows) < self.pageSize
+        for row in rows:
+            self.push(row)
+        self.stats['loaded'] += len(rows)
+        self.stats['pages'] += 1
+
+        deferred, self.deferred = self.deferred, []
+        for reminder in deferred:
+            self.schedule(reminder)
+
+    async def refresh(self):
+        # Page again from the start rather than the horizon: an unscheduled row can be due before it
+        self.horizon = (float('-inf'), 0)
+        self.refreshedAt = time.monotonic()
+        await self.loadPage()
+        if not self.exhausted:
+            # Queued reminders past the new horizon come back from the database, in order with the rows around them
+            self.heap = [entry for entry in self.heap if not self.beyondHorizon((entry[0], entry[1]))]
+            heapq.heapify(self.heap)
+            self.queued = {entry[1] for entry in self.heap}
+
+    def popDue(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now and len(due) < self.maxBatch:
+            reminder = heapq.heappop(self.heap)[2]
+            self.queued.discard(reminder[REMINDER_ID])
+            due.append(reminder)
+        return due
+
+    async def run(self):
+        while True:
+            try:
+                if not self.heap and not self.exhausted:
+                    await self.loadPage()
+                    continue
+                if time.monotonic() - self.refreshedAt >= REFRESH_INTERVAL:
+                    await self.refresh()
+                    continue
+
+                delay = self.heap[0][0] - time.time() if self.heap else MAX_SLEEP
+                if delay > 0:
+                    self.wake.clear()
+                    # Wake for the next refresh too, even with nothing queued
+                    timeout = min(delay, MAX_SLEEP, self.refreshedAt + REFRESH_INTERVAL - time.monotonic())
+                    try:
+                        await asyncio.wait_for(self.wake.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await self.deliverDue(self.popDue(time.time()))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Error in reminder scheduler: {str(e)}")
+                await asyncio.sleep(RETRY_DELAY)
+
+    async def deliverDue(self, reminders):
+        if not reminders:
+            return
+        if not await self.database.reminders.markDelivered([reminder[REMINDER_ID] for reminder in reminders]):
+            # Nothing was claimed; put them back and try again shortly
+            self.stats['claimFailures'] += 1
+            for reminder in reminders:
+                self.push(reminder)
+            await asyncio.sleep(RETRY_DELAY)
+            return
+
+        results = await asyncio.gather(*(self.deliver(reminder) for reminder in reminders), return_exceptions=True)
+        for reminder, result in zip(reminders, results):
+            if isinstance(result, Exception):
+                self.stats['failed'] += 1
+                logging.error(f"Error delivering reminder {reminder[REMINDER_ID]}: {str(result)}")
+            else:
+                self.stats['delivered'] += 1
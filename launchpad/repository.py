@@ -0,0 +1,303 @@
+import sqlite3
+import logging
+
+from .connection import connectDB, releaseDB
+from .metrics import timeCall
+
+# Table-generic repository engine.
+# One implementation of create/read/update/delete (single-row and bulk) driven by the TABLES
+# metadata below; dbAccessLayer binds it to each table under the familiar names (createUser, ...).
+
+BULK_CHUNK_SIZE = 500
+
+class TableSpec:
+    """What the engine needs to know about a table keyed by a single column.
+
+    columns: every column in table order, key first; only these may be updated.
+    insert: the columns create* takes, in argument order.
+    defaults: values for the trailing insert columns a caller may leave off.
+    aliases: keyword argument names create* accepts for a column besides the column's own name.
+    """
+
+    def __init__(self, name, columns, insert, defaults=(), aliases=None):
+        self.name = name
+        self.key = columns[0]
+        self.columns = columns
+        self.insert = insert
+        self.defaults = defaults
+        # Keyword arguments are matched case-insensitively, so createUser(..., totalMessages=3) still works
+        self.arguments = {column.lower(): index for index, column in enumerate(insert)}
+        for alias, column in (aliases or {}).items():
+            self.arguments[alias.lower()] = insert.index(column)
+        placeholders = ', '.join('?' for _ in insert)
+        # Built once so every call hands sqlite3's statement cache the same text
+        self.insertSQL = f"INSERT INTO {name} ({', '.join(insert)}) VALUES ({placeholders})"
+        self.selectSQL = f"SELECT * FROM {name} WHERE {self.key} = ?"
+        self.deleteSQL = f"DELETE FROM {name} WHERE {self.key} = ?"
+
+    def pad(self, row):
+        required = len(self.insert) - len(self.defaults)
+        if not required <= len(row) <= len(self.insert):
+            raise TypeError(f"{self.name} rows take {required} to {len(self.insert)} values, got {len(row)}")
+        return tuple(row) + self.defaults[len(row) - required:]
+
+    def bind(self, values, kwargs):
+        # Positional values and keyword arguments to one insert row, with the same errors a def would raise
+        if len(values) > len(self.insert):
+            raise TypeError(f"{self.name} rows take at most {len(self.insert)} values, got {len(values)}")
+        row = list(values) + [None] * (len(self.insert) - len(values))
+        given = set(range(len(values)))
+        for name, value in kwargs.items():
+            index = self.arguments.get(name.lower())
+            if index is None:
+                raise TypeError(f"Unknown {self.name} column {name!r}")
+            if index in given:
+                raise TypeError(f"Got multiple values for {self.name} column {self.insert[index]!r}")
+            row[index] = value
+            given.add(index)
+        required = len(self.insert) - len(self.defaults)
+        for index in range(len(self.insert)):
+            if index in given:
+                continue
+            if index < required:
+                raise TypeError(f"Missing {self.name} column {self.insert[index]!r}")
+            row[index] = self.defaults[index - required]
+        return tuple(row)
+
+TABLES = {
+    'User': TableSpec('User',
+                      ('UserID', 'Username', 'Avatar', 'IsBot', 'JoinedAt', 'Warns', 'Kicks', 'Mutes', 'TotalMessages', 'TotalReactions'),
+                      ('UserID', 'Username', 'Avatar', 'IsBot', 'JoinedAt', 'Warns', 'Kicks', 'Mutes', 'TotalMessages', 'TotalReactions'),
+                      (0, 0, 0, 0, 0)),
+    'Server': TableSpec('Server',
+                        ('ServerID', 'Name', 'Icon', 'Prefix', 'Language', 'ModRole', 'AdminRole', 'MuteRole', 'LogChannel'),
+                        ('ServerID', 'Name', 'Icon', 'Prefix', 'Language', 'ModRole', 'AdminRole', 'MuteRole', 'LogChannel')),
+    'Reminders': TableSpec('Reminders',
+                           ('ReminderID', 'ServerID', 'UserID', 'ReminderText', 'RemindAt', 'Reminded'),
+                           ('ServerID', 'UserID', 'ReminderText', 'RemindAt', 'Reminded'),
+                           (False,)),
+    'Moderations': TableSpec('Moderations',
+                             ('ModerationID', 'ServerID', 'UserID', 'Action', 'Reason', 'ModeratorID', 'CreatedAt'),
+                             ('ServerID', 'UserID', 'Action', 'Reason', 'ModeratorID', 'CreatedAt')),
+    'Suggestions': TableSpec('Suggestions',
+                             ('SuggestionID', 'ServerID', 'UserID', 'Suggestion', 'MessageID', 'CreatedAt', 'Status', 'ResolvedBy',
+                              'ResolvedAt', 'Upvotes', 'Downvotes'),
+                             ('ServerID', 'UserID', 'Suggestion', 'MessageID', 'CreatedAt', 'Status', 'ResolvedBy', 'ResolvedAt'),
+                             ('pending', None, None),
+                             {'suggestionText': 'Suggestion'}),
+    'Starboards': TableSpec('Starboards',
+                            ('StarID', 'ServerID', 'ChannelID', 'MinStars'),
+                            ('ServerID', 'ChannelID', 'MinStars'),
+                            (3,)),
+}
+
+class StatementRegistry:
+    """Builds each UPDATE statement once per (table, column set) and hands back the same SQL string.
+
+    Identical SQL text is what lets sqlite3's per-connection statement cache (STATEMENT_CACHE_SIZE)
+    reuse the prepared statement on the long-lived pooled connections.
+    """
+
+    def __init__(self, tables=TABLES):
+        self.tables = tables
+        # Column names are matched case-insensitively, like SQLite does
+        self.columnNames = {name: {c.lower(): c for c in spec.columns} for name, spec in tables.items()}
+        self.statements = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolveColumns(self, table, names):
+        known = self.columnNames[table]
+        columns = []
+        for name in names:
+            column = known.get(name.lower())
+            if column is None:
+                raise ValueError(f"Unknown column {name!r} for table {table}")
+            columns.append(column)
+        return columns
+
+    def update(self, table, names):
+        # Returns the SQL and the order the values must be bound in (key last)
+        key = (table, tuple(sorted(names)))
+        entry = self.statements.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        columns = self.resolveColumns(table, key[1])
+        setClause = ', '.join(f"{c} = ?" for c in columns)
+        entry = (f"UPDATE {table} SET {setClause} WHERE {self.tables[table].key} = ?", key[1])
+        self.statements[key] = entry
+        return entry
+
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'statements': len(self.statements),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': self.hitRate(),
+        }
+
+statements = StatementRegistry()
+
+def updateStatement(table, key, kwargs):
+    sql, order = statements.update(table, kwargs)
+    return sql, [kwargs[name] for name in order] + [key]
+
+# Single-row operations
+
+@timeCall('create')
+def createRow(table, *values, **kwargs):
+    # Returns the new row's rowid: the generated ID, or the key itself for User/Server.
+    # Columns may be passed by keyword too, under the create function's old argument names
+    spec = TABLES[table]
+    row = spec.bind(values, kwargs) if kwargs else spec.pad(values)
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(spec.insertSQL, row)
+            conn.commit()
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            logging.error(f"Error creating {table} row: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return None
+
+@timeCall('read')
+def readRow(table, key):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(TABLES[table].selectSQL, (key,))
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading {table} row: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return None
+
+@timeCall('update')
+def updateRow(table, key, **kwargs):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            sql, values = updateStatement(table, key, kwargs)
+            cursor.execute(sql, values)
+            conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            logging.error(f"Error updating {table} row: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return None
+
+@timeCall('delete')
+def deleteRow(table, key):
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(TABLES[table].deleteSQL, (key,))
+            conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            logging.error(f"Error deleting {table} row: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return None
+
+# Bulk operations: one transaction and executemany per call instead of one commit per row.
+# Rows passed to create*/ensure* use the same argument order as the single-row create functions;
+# trailing arguments that have defaults there may be left off here too.
+
+def chunked(items, size=BULK_CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+@timeCall('createMany')
+def createMany(table, rows, conflict=''):
+    spec = TABLES[table]
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(f"{spec.insertSQL} {conflict}", [spec.pad(row) for row in rows])
+            conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            logging.error(f"Error creating {table} rows: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return None
+
+@timeCall('readMany')
+def readMany(table, keys):
+    keyColumn = TABLES[table].key
+    rows = {}
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            for chunk in chunked(keys):
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor.execute(f"SELECT * FROM {table} WHERE {keyColumn} IN ({placeholders})", chunk)
+                # The key column is the first column of every table
+                for row in cursor.fetchall():
+                    rows[row[0]] = row
+        except sqlite3.Error as e:
+            logging.error(f"Error reading {table} rows: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return rows
+
+@timeCall('updateMany')
+def updateMany(table, changes):
+    # changes: {key: {column: value}}; rows changing the same columns share one executemany
+    groups = {}
+    for key, values in changes.items():
+        sql, params = updateStatement(table, key, values)
+        groups.setdefault(sql, []).append(params)
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            updated = 0
+            for sql, params in groups.items():
+                cursor.executemany(sql, params)
+                updated += cursor.rowcount
+            conn.commit()
+            return updated
+        except sqlite3.Error as e:
+            logging.error(f"Error updating {table} rows: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return None
+
+@timeCall('deleteMany')
+def deleteMany(table, keys):
+    keyColumn = TABLES[table].key
+    conn = connectDB()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            deleted = 0
+            for chunk in chunked(keys):
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor.execute(f"DELETE FROM {table} WHERE {keyColumn} IN ({placeholders})", chunk)
+                deleted += cursor.rowcount
+            conn.commit()
+            return deleted
+        except sqlite3.Error as e:
+            logging.error(f"Error deleting {table} rows: {str(e)}")
+        finally:
+            releaseDB(conn)
+    return None
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from collections import OrderedDict
+import discord
+from discord.ext import tasks
+
+from . import dbAccessLayer
+from .caches import StarboardConfigCache
+
+# Reposts messages that collect enough star reactions to the guild's starboard channel(s).
+# Star counts live in memory; a burst of reactions on one message is collapsed into a single
+# send/edit after EDIT_DELAY seconds. Which message reposts which is kept in StarboardPosts,
+# so a restart edits the existing repost instead of posting again. Star totals on those rows are
+# written behind in batches, like the activity counters.
+
+STAR = '\N{WHITE MEDIUM STAR}'
+EDIT_DELAY = 2.0
+FLUSH_INTERVAL = 30.0
+TRACKED_MESSAGES = 10000
+
+STAR_ID = 0
+CHANNEL_ID = 2
+MIN_STARS = 3
+
+POST_STAR_ID = 1
+POST_ID = 4
+
+class Starboard:
+    def __init__(self, bot, database, editDelay=EDIT_DELAY, flushInterval=FLUSH_INTERVAL, maxTracked=TRACKED_MESSAGES):
+        self.bot = bot
+        self.database = database
+        self.editDelay = editDelay
+        self.maxTracked = maxTracked
+        self.configs = StarboardConfigCache(database)
+        # messageID -> latest star count, and messageID -> {StarID: PostID}
+        self.counts = OrderedDict()
+        self.posts = OrderedDict()
+        # Messages with a count change not yet applied, and the task waiting to apply it
+        self.dirty = {}
+        self.pending = {}
+        # (messageID, StarID) -> stars not yet written to StarboardPosts
+        self.pendingStars = {}
+        self.stats = {'reactions': 0, 'posts': 0, 'edits': 0, 'flushes': 0, 'failures': 0}
+
+        self.flushLoop = tasks.loop(seconds=flushInterval)(self.flush)
+        database.addShutdownHook(self.flushNow)
+
+    def start(self):
+        if not self.flushLoop.is_running():
+            self.flushLoop.start()
+
+    def track(self, reaction):
+        # Call from on_reaction_add / on_reaction_remove
+        message = reaction.message
+        if str(reaction.emoji) != STAR or message.guild is None:
+            return
+        self.stats['reactions'] += 1
+        self.remember(self.counts, message.id, reaction.count)
+        self.dirty[message.id] = message
+        if message.id not in self.pending:
+            self.pending[message.id] = asyncio.create_task(self.applyLater(message.id))
+
+    def remember(self, entries, key, value):
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.maxTracked:
+            entries.popitem(last=False)
+
+    async def applyLater(self, messageID):
+        try:
+            # Keep going while reactions arrive, but touch Discord at most once per editDelay
+            while True:
+                await asyncio.sleep(self.editDelay)
+                message = self.dirty.pop(messageID, None)
+                if message is None:
+                    return
+                try:
+                    await self.apply(message, self.counts.get(messageID, 0))
+                except Exception as e:
+                    self.stats['failures'] += 1
+                    logging.error(f"Error updating starboard for message {messageID}: {str(e)}")
+        finally:
+            self.pending.pop(messageID, None)
+
+    async def postsFor(self, messageID):
+        posts = self.posts.get(messageID)
+        if posts is None:
+            rows = await self.database.starboards.posts(messageID)
+            posts = {row[POST_STAR_ID]: row[POST_ID] for row in rows}
+            self.remember(self.posts, messageID, posts)
+        return posts
+
+    async def apply(self, message, stars):
+        starboards = await self.configs.get(message.guild.id)
+        if not starboards:
+            return
+        posts = await self.postsFor(message.id)
+        for starboard in starboards:
+            starID = starboard[STAR_ID]
+            channel = self.bot.get_channel(starboard[CHANNEL_ID])
+            # Reposts starred on the starboard itself stay where they are
+            if channel is None or message.channel.id == channel.id:
+                continue
+
+            postID = posts.get(starID)
+            if postID is not None:
+                await channel.get_partial_message(postID).edit(content=self.header(message, stars))
+                self.pendingStars[(message.id, starID)] = stars
+                self.stats['edits'] += 1
+            elif stars >= starboard[MIN_STARS]:
+                post = await channel.send(self.header(message, stars), embed=self.embed(message))
+                posts[starID] = post.id
+                await self.database.starboards.addPost(message.id, starID, message.guild.id,
+                                                       message.channel.id, post.id, stars)
+                self.stats['posts'] += 1
+
+    def header(self, message, stars):
+        return f"{STAR} **{stars}** {message.channel.mention}"
+
+    def embed(self, message):
+        embed = discord.Embed(description=message.content, colour=discord.Colour.gold(), timestamp=message.created_at)
+        embed.set_author(name=message.author.display_name, icon_url=message.author.display_avatar.url)
+        embed.add_field(name="Source", value=f"[Jump to message]({message.jump_url})")
+        for attachment in message.attachments:
+            if attachment.content_type and attachment.content_type.startswith('image/'):
+                embed.set_image(url=attachment.url)
+                break
+        return embed
+
+    def drain(self):
+        pending, self.pendingStars = self.pendingStars, {}
+        return [(stars, messageID, starID) for (messageID, starID), stars in pending.items()]
+
+    def restore(self, rows):
+        for stars, messageID, starID in rows:
+            self.pendingStars.setdefault((messageID, starID), stars)
+
+    async def flush(self):
+        rows = self.drain()
+        if not rows:
+            return
+        if await self.database.starboards.updatePostStars(rows):
+            self.stats['flushes'] += 1
+        else:
+            self.restore(rows)
+
+    def flushNow(self):
+        rows = self.drain()
+        if rows and not dbAccessLayer.updateStarboardPostStars(rows):
+            self.restore(rows)
@@ -0,0 +1,146 @@
+import sqlite3
+from collections import OrderedDict
+from datetime import datetime
+from discord.ext import tasks
+
+from . import dbAccessLayer
+
+# Vote tallying for the suggestion workflow.
+# Each vote reaction only updates an in-memory tally of the suggestion's current up/down counts;
+# a tasks.loop writes every changed tally back with one updateMany. Tallies are absolute counts
+# read off the message, so a retried or repeated flush can't double count.
+
+UPVOTE = '\N{THUMBS UP SIGN}'
+DOWNVOTE = '\N{THUMBS DOWN SIGN}'
+FLUSH_INTERVAL = 10.0
+TRACKED_MESSAGES = 10000
+
+SUGGESTION_ID = 0
+SERVER_ID = 1
+MESSAGE_ID = 4
+STATUS = 6
+UPVOTES = 9
+DOWNVOTES = 10
+
+class SuggestionVotes:
+    def __init__(self, bot, database, flushInterval=FLUSH_INTERVAL, maxTracked=TRACKED_MESSAGES):
+        self.bot = bot
+        self.database = database
+        self.maxTracked = maxTracked
+        # MessageID -> SuggestionID of a pending suggestion, or None for any other bot message
+        self.messages = OrderedDict()
+        # SuggestionID -> (upvotes, downvotes) not yet written
+        self.pending = {}
+        # Tallies drained by the flush in progress, until it finishes
+        self.flushing = {}
+        # SuggestionIDs resolved since the last drain; a failed flush must not restore their stale tallies
+        self.resolved = set()
+        self.stats = {'votes': 0, 'lookups': 0, 'flushes': 0, 'rows': 0, 'failures': 0}
+
+        self.flushLoop = tasks.loop(seconds=flushInterval)(self.flush)
+        database.addShutdownHook(self.flushNow)
+
+    def start(self):
+        if not self.flushLoop.is_running():
+            self.flushLoop.start()
+
+    def register(self, messageID, suggestionID):
+        self.messages[messageID] = suggestionID
+        self.messages.move_to_end(messageID)
+        if len(self.messages) > self.maxTracked:
+            self.messages.popitem(last=False)
+
+    async def suggestionFor(self, message):
+        if message.id in self.messages:
+            self.messages.move_to_end(message.id)
+            return self.messages[message.id]
+        self.stats['lookups'] += 1
+        row = await self.database.suggestions.byMessage(message.id)
+        suggestionID = row[SUGGESTION_ID] if row and row[STATUS] == 'pending' else None
+        self.register(message.id, suggestionID)
+        return suggestionID
+
+    async def track(self, reaction):
+        # Call from on_reaction_add / on_reaction_remove
+        message = reaction.message
+        if str(reaction.emoji) not in (UPVOTE, DOWNVOTE) or message.author.id != self.bot.user.id:
+            return
+        suggestionID = await self.suggestionFor(message)
+        if suggestionID is None:
+            return
+        self.stats['votes'] += 1
+        self.pending[suggestionID] = self.countVotes(message)
+
+    def countVotes(self, message):
+        votes = {UPVOTE: 0, DOWNVOTE: 0}
+        for reaction in message.reactions:
+            emoji = str(reaction.emoji)
+            if emoji in votes:
+                # Leave out the bot's own reaction that seeds the buttons
+                votes[emoji] = reaction.count - (1 if reaction.me else 0)
+        return votes[UPVOTE], votes[DOWNVOTE]
+
+    def votes(self, row):
+        # Latest tally for a Suggestions row, including votes not flushed yet
+        suggestionID = row[SUGGESTION_ID]
+        if suggestionID in self.pending:
+            return self.pending[suggestionID]
+        return self.flushing.get(suggestionID, (row[UPVOTES], row[DOWNVOTES]))
+
+    async def resolve(self, row, status, resolvedBy):
+        # Final tally is written together with the status; later votes on the message are ignored.
+        # Raises sqlite3.Error if nothing was written, with the suggestion still pending and tracked
+        suggestionID = row[SUGGESTION_ID]
+        upvotes, downvotes = self.votes(row)
+        tally = self.pending.pop(suggestionID, None)
+        wasResolved = suggestionID in self.resolved
+        self.resolved.add(suggestionID)
+        if row[MESSAGE_ID] is not None:
+            self.register(row[MESSAGE_ID], None)
+        updated = await self.database.suggestions.update(suggestionID, Status=status, ResolvedBy=resolvedBy,
+                                                         ResolvedAt=datetime.utcnow(), Upvotes=upvotes, Downvotes=downvotes)
+        if not updated:
+            if tally is not None:
+                self.pending.setdefault(suggestionID, tally)
+            if not wasResolved:
+                self.resolved.discard(suggestionID)
+            if row[MESSAGE_ID] is not None:
+                self.register(row[MESSAGE_ID], suggestionID)
+            raise sqlite3.OperationalError(f"Could not save the resolution of suggestion #{suggestionID}")
+        return upvotes, downvotes
+
+    def drain(self):
+        # Flushes never overlap, so anything resolved before this point has no tally left to restore
+        self.resolved.clear()
+        pending, self.pending = self.pending, {}
+        self.flushing = pending
+        return {suggestionID: {'Upvotes': upvotes, 'Downvotes': downvotes}
+                for suggestionID, (upvotes, downvotes) in pending.items()}
+
+    def restore(self, changes):
+        # Newer tallies recorded during the failed flush win, and resolve() already wrote the final one
+        for suggestionID, values in changes.items():
+            if suggestionID in self.resolved:
+                continue
+            self.pending.setdefault(suggestionID, (values['Upvotes'], values['Downvotes']))
+
+    async def flush(self):
+        changes = self.drain()
+        if not changes:
+            return
+        try:
+            written = await self.database.suggestions.updateMany(changes)
+        finally:
+            self.flushing = {}
+        if written is not None:
+            self.stats['flushes'] += 1
+            self.stats['rows'] += len(changes)
+        else:
+            self.stats['failures'] += 1
+            self.restore(changes)
+
+    def flushNow(self):
+        changes = self.drain()
+        self.flushing = {}
+        if changes and dbAccessLayer.updateSuggestions(changes) is None:
+            self.restore(changes)